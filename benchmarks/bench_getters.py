@@ -0,0 +1,90 @@
+"""
+Time every getter against a corpus of replayed "show ..." outputs.
+
+Usage:
+    python benchmarks/bench_getters.py [--corpus DIR] [--repeat N] [--save FILE] [--baseline FILE] [--tolerance X]
+
+Without --corpus a synthetic corpus (see corpus.py) is built in a temporary directory,
+otherwise every subdirectory of DIR is a replay directory (synthetic or recorded).
+--save writes the timings as JSON, --baseline compares against such a file and exits
+with status 1 if a getter got slower than tolerance times its baseline.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import timeit
+
+from corpus import build_corpus
+from napalm_eltex.eltex import CEDriver, GETTER_COMMANDS
+
+GETTERS = sorted(GETTER_COMMANDS) + ['get_config']
+
+
+def bench_directory(path, repeat):
+    """Return {getter: best time in seconds} for one replay directory."""
+    driver = CEDriver('replay', '', '', optional_args={'transport': 'replay', 'replay_dir': path})
+    driver.open()
+    # вывод читаем с диска один раз, замеряется только разбор
+    driver.device.outputs = {
+        command: driver.device.send_command(command)
+        for commands in GETTER_COMMANDS.values() for command in commands
+    }
+    driver.device.outputs['show running-config'] = driver.device.send_command('show running-config')
+    driver.device.outputs['show startup-config'] = driver.device.send_command('show startup-config')
+
+    timings = {}
+    for getter in GETTERS:
+        method = getattr(driver, getter)
+        timings[getter] = min(timeit.repeat(method, number=1, repeat=repeat))
+    driver.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--corpus', help='directory of replay directories')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--save', help='write timings to this JSON file')
+    parser.add_argument('--baseline', help='compare with timings from this JSON file')
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.corpus:
+            paths = {
+                name: os.path.join(args.corpus, name) for name in sorted(os.listdir(args.corpus))
+                if os.path.isdir(os.path.join(args.corpus, name))
+            }
+        else:
+            paths = build_corpus(tmp)
+
+        results = {}
+        print('{0:<24} {1:<26} {2:>10}'.format('corpus', 'getter', 'ms'))
+        for name, path in paths.items():
+            results[name] = bench_directory(path, args.repeat)
+            for getter, seconds in results[name].items():
+                print('{0:<24} {1:<26} {2:>10.2f}'.format(name, getter, seconds * 1000))
+
+    if args.save:
+        with open(args.save, 'w') as fs:
+            json.dump(results, fs, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as fs:
+            baseline = json.load(fs)
+        regressions = []
+        for name, timings in results.items():
+            for getter, seconds in timings.items():
+                before = baseline.get(name, {}).get(getter)
+                if before and seconds > before * args.tolerance:
+                    regressions.append('{0} {1}: {2:.2f} ms -> {3:.2f} ms'.format(
+                        name, getter, before * 1000, seconds * 1000))
+        if regressions:
+            print('\nRegressions:\n' + '\n'.join(regressions))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark of the "show interfaces" parser on synthetic output.
+
+The block-concatenation parsers the driver used before (one for get_interfaces,
+one for the errors of get_interfaces_counters) are timed as the baseline.
+
+Usage: python benchmarks/bench_show_interfaces.py [interfaces] [repeat]
+"""
+import re
+import sys
+import timeit
+
+from corpus import synthetic_show_interfaces
+from napalm_eltex.eltex import CEDriver
+
+RE_IFNAME = '(-+)( show interfaces )(?P<ifname>[a-zA-Z]+[0-9/]+)(.)(-+)'
+
+
+def _blocks(show_interfaces):
+    """Old code: build a text block per interface by string concatenation."""
+    data_block = []
+    _temp = ''
+    for line in (show_interfaces + '\n\r--------------').splitlines():
+        if '--------------' in line:
+            if _temp != '':
+                data_block.append(_temp)
+            _temp = line + '\n'
+        else:
+            _temp += line + '\n'
+    return data_block
+
+
+def baseline_interfaces(show_interfaces):
+    """Old get_interfaces parse: every pattern searched over every block."""
+    re_ifmac = '(MAC address is )(?P<ifmac>([0-9A-Fa-f]{2}[:-]){5}([0-9A-fa-f]{2}))'
+    re_ifup = '(?P<ifup>is up )'
+    re_ifdesc = '(Description: )(?P<ifdesc>.*)'
+    re_ifmtu = '(Interface MTU is )(?P<ifmtu>[0-9]*)'
+    re_ifspeed = '((Full|Half)-duplex, )((?P<ifspeed>[0-9]+)(Mbps))'
+    re_ifuptime = '(Link is up for )((?P<days>[0-9]+) days, )((?P<hours>[0-9]+) hours, )' \
+                  '((?P<minutes>[0-9]+) minutes and )((?P<seconds>[0-9]+) seconds)'
+    interfaces = {}
+    for data in _blocks(show_interfaces):
+        interface = {
+            'description': '', 'is_enabled': False, 'is_up': False, 'last_flapped': -1,
+            'mac_address': '', 'speed': 0, 'mtu': 0
+        }
+        match = re.search(RE_IFNAME, data, flags=re.M)
+        name = match.group('ifname') if match else ''
+        match = re.search(re_ifmac, data, flags=re.M)
+        if match:
+            interface['mac_address'] = match.group('ifmac')
+        if re.search(re_ifup, data, flags=re.M):
+            interface['is_up'] = interface['is_enabled'] = True
+        match = re.search(re_ifdesc, data, flags=re.M)
+        if match:
+            interface['description'] = match.group('ifdesc')
+        match = re.search(re_ifmtu, data, flags=re.M)
+        if match:
+            interface['mtu'] = int(match.group('ifmtu'))
+        match = re.search(re_ifspeed, data, flags=re.M)
+        if match:
+            interface['speed'] = int(match.group('ifspeed'))
+        match = re.search(re_ifuptime, data, flags=re.M)
+        if match:
+            interface['last_flapped'] = int(match.group('days')) * 86400 + int(match.group('hours')) * 3600 + \
+                int(match.group('minutes')) * 60 + int(match.group('seconds'))
+        interfaces[name] = interface
+    return interfaces
+
+
+def baseline_errors(show_interfaces):
+    """Old error scrape of get_interfaces_counters: the blocks are built again and searched."""
+    errors = {}
+    for data in _blocks(show_interfaces):
+        match = re.search(RE_IFNAME, data, flags=re.M)
+        name = match.group('ifname') if match else ''
+        in_err = re.search(r'(?P<in_err>\d+)( input errors)', data, flags=re.M)
+        out_err = re.search(r'(?P<out_err>\d+)( output errors)', data, flags=re.M)
+        errors[name] = (int(in_err.group('in_err')) if in_err else 0, int(out_err.group('out_err')) if out_err else 0)
+    return errors
+
+
+def best_ms(function, output, repeat):
+    return min(timeit.repeat(lambda: function(output), number=1, repeat=repeat)) * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    output = synthetic_show_interfaces(count)
+
+    interfaces = CEDriver._parse_show_interfaces(output)
+    assert len(interfaces) == count, len(interfaces)
+    baseline = baseline_interfaces(output)
+    assert len(baseline) == count, len(baseline)
+    # новый парсер должен давать те же поля, что и старый
+    errors = baseline_errors(output)
+    for name, interface in baseline.items():
+        assert all(interfaces[name][field] == value for field, value in interface.items()), name
+        assert (interfaces[name]['rx_error'], interfaces[name]['tx_error']) == errors[name], name
+
+    print('show interfaces: {0} interfaces, {1} bytes'.format(count, len(output)))
+    old_interfaces = best_ms(baseline_interfaces, output, repeat)
+    old_errors = best_ms(baseline_errors, output, repeat)
+    new = best_ms(CEDriver._parse_show_interfaces, output, repeat)
+    print('  get_interfaces:          {0:.2f} ms -> {1:.2f} ms'.format(old_interfaces, new))
+    print('  get_interfaces_counters: {0:.2f} ms -> {1:.2f} ms'.format(old_errors, new))
+
+
+if __name__ == '__main__':
+    main()
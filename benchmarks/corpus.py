@@ -0,0 +1,274 @@
+"""
+Synthetic corpus of Eltex "show ..." outputs for replay benchmarks.
+
+Usage: python benchmarks/corpus.py <directory>
+
+Writes one replay directory per profile (see PROFILES), in the layout read by
+CEDriver with optional_args={'transport': 'replay', 'replay_dir': ...}.
+Recorded sessions of real devices (napalm_eltex.replay.record_session) can be
+put next to them.
+"""
+import os
+import sys
+
+from napalm_eltex.replay import fixture_name
+
+# units - stack members, ports - gigabit ports per unit (+4 ten-gigabit uplinks)
+PROFILES = {
+    'mes2324_24port': {'units': 1, 'ports': 24, 'vlans': 8, 'macs': 400, 'arps': 40, 'neighbors': 6},
+    'mes2348_48port': {'units': 1, 'ports': 48, 'vlans': 16, 'macs': 1500, 'arps': 150, 'neighbors': 12},
+    'stack_8x48': {'units': 8, 'ports': 48, 'vlans': 64, 'macs': 8000, 'arps': 800, 'neighbors': 40},
+    'vlan_4k': {'units': 1, 'ports': 24, 'vlans': 4094, 'macs': 2000, 'arps': 200, 'neighbors': 4},
+    'mac_30k': {'units': 2, 'ports': 48, 'vlans': 256, 'macs': 30000, 'arps': 4000, 'neighbors': 16},
+}
+
+INTERFACE_BLOCK = """--------------- show interfaces {name} ---------------
+
+{name} is up (connected)
+  Interface index is {index}
+  Hardware is Ethernet, MAC address is a8:f9:4b:8b:{hi:02x}:{lo:02x}
+  Description: access port {index}
+  Interface MTU is 1500
+  Link is up for 5 days, 3 hours, 10 minutes and 4 seconds
+  Full-duplex, 1000Mbps, link type is auto, media type is 1G-Copper
+  flow-control is off
+  Output flow-control is off
+  Input flow-control is off
+    15 packets input, 1200 bytes, 0 throttles
+    Received 0 broadcasts (0 multicasts)
+    0 runts, 0 giants, 0 throttles
+    {index} input errors, 0 CRC, 0 frame
+    0 overrun, 0 ignored
+    0 watchdog, 0 multicast, 0 pause input
+    30 packets output, 1000 bytes, 0 underrun
+    {index} output errors, 0 collisions, 0 interface resets
+    0 babbles, 0 late collision, 0 deferred
+    0 lost carrier, 0 no carrier
+    0 output buffer failures, 0 output buffers swapped out
+"""
+
+COUNTER_WIDTHS = (10, 12, 12, 12, 12)
+
+
+def interface_names(units, ports):
+    """Return port names of a stack: gigabit ports and four ten-gigabit uplinks per unit."""
+    names = []
+    for unit in range(1, units + 1):
+        names += ['gi{0}/0/{1}'.format(unit, port) for port in range(1, ports + 1)]
+        names += ['te{0}/0/{1}'.format(unit, port) for port in range(1, 5)]
+    return names
+
+
+def show_interfaces(names):
+    blocks = []
+    for index, name in enumerate(names):
+        blocks.append(INTERFACE_BLOCK.format(name=name, index=index, hi=index // 256 % 256, lo=index % 256))
+    return '\n'.join(blocks)
+
+
+def synthetic_show_interfaces(count):
+    """Return "show interfaces" output of a stack with count ports."""
+    return show_interfaces(['gi{0}/0/{1}'.format(index // 52 + 1, index % 52 + 1) for index in range(count)])
+
+
+def _counter_rows(name, values):
+    """Format a counters row, wrapping values wider than their column onto the next line like Eltex does."""
+    first = [name.ljust(COUNTER_WIDTHS[0])]
+    rest = [' ' * COUNTER_WIDTHS[0]]
+    wrapped = False
+    for value, width in zip(values, COUNTER_WIDTHS[1:]):
+        value = str(value)
+        if len(value) > width:
+            first.append(value[:width])
+            rest.append(value[width:].ljust(width))
+            wrapped = True
+        else:
+            first.append(value.rjust(width))
+            rest.append(' ' * width)
+    rows = [' '.join(first)]
+    if wrapped:
+        rows.append(' '.join(rest).rstrip())
+    return rows
+
+
+def show_interfaces_counters(names):
+    tables = []
+    for direction in ('In', 'Out'):
+        lines = [
+            '    Port      {0:>12} {1:>12} {2:>12} {3:>12}'.format(
+                direction + 'UcastPkts', direction + 'McastPkts', direction + 'BcastPkts', direction + 'Octets'),
+            ' '.join('-' * width for width in COUNTER_WIDTHS)
+        ]
+        for index, name in enumerate(names):
+            # у аплинков октеты не помещаются в колонку
+            octets = 1061448584480 + index if name.startswith('te') else 10614485844 + index
+            lines += _counter_rows(name, (1396550631 + index, 314766 + index, 59701 + index, octets))
+        tables.append('\n'.join(lines))
+    return '\n\n'.join(tables) + '\n'
+
+
+def show_interfaces_status(names):
+    lines = [
+        '                                             Flow Link          Back   Mdix',
+        'Port     Type         Duplex  Speed Neg      ctrl State       Pressure Mode',
+        '-------- ------------ ------  ----- -------- ---- ----------- -------- -------'
+    ]
+    for name in names:
+        media, speed = ('10G-Fiber', '10000') if name.startswith('te') else ('1G-Copper', '1000')
+        lines.append('{0:<8} {1:<12} Full    {2:<5} Enabled  Off  Up          Disabled Off'.format(name, media, speed))
+    return '\n'.join(lines) + '\n'
+
+
+def show_vlan(vlans):
+    lines = [
+        'Created by: D-Default, S-Static, G-GVRP, R-Radius Assigned VLAN, V-Voice VLAN',
+        '',
+        'Vlan       Name                  Tagged Ports      UnTagged Ports      Created by',
+        '---- ----------------- ------------------ ------------------ ----------------'
+    ]
+    for vlan in range(1, vlans + 1):
+        lines.append(' {0:<4} {1:<17} {2:<18} {3:<18} {4}'.format(
+            vlan, 'Vlan{0}'.format(vlan) if vlan > 1 else '1', 'te1/0/1-2', 'gi1/0/1-24,' if vlan == 1 else '',
+            'D' if vlan == 1 else 'S'))
+    return '\n'.join(lines) + '\n'
+
+
+def show_mac_address_table(names, macs, vlans):
+    lines = [
+        'Flags: I - Internal usage VLAN',
+        'Aging time is 300 sec',
+        '',
+        '    Vlan          Mac Address         Port       Type',
+        '------------ --------------------- ---------- ----------'
+    ]
+    access = [name for name in names if name.startswith('gi')]
+    for index in range(macs):
+        port = access[index % len(access)] if index % 4 else 'te1/0/1'
+        lines.append('{0:>8}         {1}    {2:<10} {3}'.format(
+            index % vlans + 1, mac_address(index), port, 'dynamic' if index % 50 else 'static'))
+    return '\n'.join(lines) + '\n'
+
+
+def show_arp(names, arps):
+    lines = [
+        '',
+        'Total number of entries: {0}'.format(arps),
+        '',
+        '  VLAN    Interface     IP address        HW address          status',
+        '--------- --------- --------------- ------------------- ---------------'
+    ]
+    for index in range(arps):
+        lines.append(' vlan {0:<4} {1:<9}  {2:<15} {3}   dynamic'.format(
+            index % 8 + 1, names[index % len(names)], '10.{0}.{1}.{2}'.format(index // 65536, index // 256 % 256, index % 256),
+            mac_address(index)))
+    return '\n'.join(lines) + '\n'
+
+
+def show_lldp_neighbors(names, neighbors):
+    lines = [
+        '',
+        'System capability supported: Bridge, Router, Telephone',
+        '',
+        '  Port        Device ID          Port ID          System Name    Capabilities',
+        '--------- ----------------- ----------------- ----------------- ------------'
+    ]
+    for index in range(neighbors):
+        lines.append('{0:<9} {1} {2:<17}     {3:<14} B, T'.format(
+            names[index % len(names)], mac_address(index + 1000000), mac_address(index + 2000000),
+            'SIP-T46S-{0}'.format(index)))
+    return '\n'.join(lines) + '\n'
+
+
+def show_system(units):
+    return '\n'.join([
+        'System Description:                       MES2348B 48-port 1G/10G Managed Switch',
+        'System Up Time (days,hour:min:sec):        86,19:55:46',
+        'System Contact:',
+        'System Name:                               sw-bench-{0}'.format(units),
+        'System Location:',
+        'System MAC Address:                        e8:28:c1:3b:c0:40',
+    ]) + '\n'
+
+
+def show_system_id(units):
+    lines = ['Unit    Serial number', '---- -----------------']
+    lines += [' {0}     ES5E0002{1:02d}'.format(unit, unit) for unit in range(1, units + 1)]
+    return '\n'.join(lines) + '\n'
+
+
+SHOW_VERSION = """Active-image: flash://system/images/mes3300-4014-3R1.ros
+  Version: 4.0.14.3
+  Commit: 30b0f7fe
+  Build: 1 (master)
+  MD5 Digest: 74e0d4f5e0c37a4fe0f4a41e3e01ea75
+  Date: 20-Dec-2020
+  Time: 19:57:56
+Inactive-image: flash://system/images/_mes3300-4014-R1.ros
+  Version: 4.0.14.1
+"""
+
+SHOW_IP_INTERFACE = """
+    IP Address         I/F      I/F Status  Type     Directed   Prec Redirect Status
+                                admin/oper           Broadcast
+------------------ ------------ ---------- ------- --------- ---- -------- ------
+10.0.0.5/24        vlan 1       UP/UP      Static  disable   No   enable   Valid
+"""
+
+
+def mac_address(index):
+    return '00:16:b9:{0:02x}:{1:02x}:{2:02x}'.format(index // 65536 % 256, index // 256 % 256, index % 256)
+
+
+def running_config(names, vlans):
+    lines = ['vlan database', ' vlan 2-{0}'.format(vlans) if vlans > 1 else ' vlan 1', 'exit', '!']
+    for name in names:
+        lines += ['interface {0}'.format(name), ' description "port {0}"'.format(name), ' switchport mode trunk', 'exit', '!']
+    return '\n'.join(lines) + '\n'
+
+
+def profile_outputs(profile):
+    """Return {command: output} for a profile of PROFILES."""
+    names = interface_names(profile['units'], profile['ports'])
+    config = running_config(names, profile['vlans'])
+    outputs = {
+        'show system': show_system(profile['units']),
+        'show system id': show_system_id(profile['units']),
+        'show version': SHOW_VERSION,
+        'show interfaces status': show_interfaces_status(names),
+        'show vlan': show_vlan(profile['vlans']),
+        'show interfaces': show_interfaces(names),
+        'show interfaces counters': show_interfaces_counters(names),
+        'show ip interface': SHOW_IP_INTERFACE,
+        'show arp': show_arp(names, profile['arps']),
+        'show lldp neighbors': show_lldp_neighbors(names, profile['neighbors']),
+        'show mac address-table': show_mac_address_table(names, profile['macs'], profile['vlans']),
+        'show running-config': config,
+        'show startup-config': config,
+    }
+    # вывод по отдельным портам для опроса только аплинков
+    for name in names:
+        if name.startswith('te'):
+            outputs['show interfaces ' + name] = show_interfaces([name])
+            outputs['show interfaces counters ' + name] = show_interfaces_counters([name])
+    return outputs
+
+
+def build_corpus(directory, profiles=None):
+    """Write replay directories of the profiles, return {profile: path}."""
+    paths = {}
+    for name in (profiles or sorted(PROFILES)):
+        path = os.path.join(directory, name)
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        for command, output in profile_outputs(PROFILES[name]).items():
+            with open(os.path.join(path, fixture_name(command)), 'w', encoding='utf-8') as fs:
+                fs.write(output)
+        paths[name] = path
+    return paths
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        sys.exit(__doc__)
+    for name, path in build_corpus(sys.argv[1]).items():
+        print(name, path)
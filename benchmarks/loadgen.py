@@ -0,0 +1,98 @@
+"""
+Concurrent CEDriver sessions against a (simulated) switch: throughput and latency percentiles.
+
+Usage:
+    python benchmarks/loadgen.py [--host 127.0.0.1] [--port 8022] [--sessions 50] [--iterations 10]
+                                 [--getters get_facts,get_interfaces_counters] [--pipeline] [--cache]
+
+Opens --sessions drivers at once (one thread each), every session runs the getter
+mix --iterations times. Start benchmarks/simulator.py first to run without hardware.
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from napalm_eltex.eltex import CEDriver
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(percent / 100.0 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def run_session(args, getters, timings, errors, lock):
+    optional_args = {'port': args.port, 'pipeline': args.pipeline, 'command_cache': args.cache}
+    started = time.monotonic()
+    try:
+        driver = CEDriver(args.host, args.username, args.password, timeout=args.timeout, optional_args=optional_args)
+        driver.open()
+    except Exception as err:
+        with lock:
+            errors.append('open: {0}'.format(err))
+        return
+    with lock:
+        timings.setdefault('open', []).append(time.monotonic() - started)
+
+    try:
+        for _ in range(args.iterations):
+            for getter in getters:
+                started = time.monotonic()
+                try:
+                    getattr(driver, getter)()
+                except Exception as err:
+                    with lock:
+                        errors.append('{0}: {1}'.format(getter, err))
+                    continue
+                with lock:
+                    timings.setdefault(getter, []).append(time.monotonic() - started)
+            # без кэша между итерациями, иначе меряется только первый проход
+            driver.invalidate_cache()
+    finally:
+        driver.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CEDriver load generator')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8022)
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--timeout', type=int, default=60)
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--getters', default='get_facts,get_interfaces,get_interfaces_counters,get_mac_address_table')
+    parser.add_argument('--pipeline', action='store_true', help="enable the 'pipeline' optional argument")
+    parser.add_argument('--cache', action='store_true', help="enable the 'command_cache' optional argument")
+    args = parser.parse_args()
+
+    getters = [getter.strip() for getter in args.getters.split(',') if getter.strip()]
+    timings = {}
+    errors = []
+    lock = threading.Lock()
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        for _ in range(args.sessions):
+            executor.submit(run_session, args, getters, timings, errors, lock)
+    elapsed = time.monotonic() - started
+
+    calls = sum(len(values) for name, values in timings.items() if name != 'open')
+    print('sessions {0}, getter calls {1}, errors {2}, wall {3:.2f} s, throughput {4:.1f} calls/s'.format(
+        args.sessions, calls, len(errors), elapsed, calls / elapsed if elapsed else 0.0))
+    print('{0:<26} {1:>7} {2:>9} {3:>9} {4:>9} {5:>9}'.format('', 'count', 'p50 ms', 'p90 ms', 'p99 ms', 'max ms'))
+    for name in ['open'] + getters:
+        values = timings.get(name, [])
+        print('{0:<26} {1:>7} {2:>9.1f} {3:>9.1f} {4:>9.1f} {5:>9.1f}'.format(
+            name, len(values), percentile(values, 50) * 1000, percentile(values, 90) * 1000,
+            percentile(values, 99) * 1000, max(values or [0.0]) * 1000))
+    for error in errors[:10]:
+        print('error: ' + error)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+"""
+Simulated Eltex CLI over SSH, answering with canned outputs (needs asyncssh).
+
+Usage:
+    python benchmarks/simulator.py [--port 8022] [--profile mes2348_48port | --replay-dir DIR]
+                                   [--latency 0.05] [--command-latency "show interfaces=0.8"] [--macs 30000]
+                                   [--sftp-root DIR]
+
+Any username is accepted with the password given by --password (default: admin).
+Outputs come from a corpus profile (see corpus.py, sizes can be overridden with
+--units/--ports/--vlans/--macs/--arps) or from a replay directory. Every command
+is answered after --latency seconds, --command-latency sets it per command.
+"configure" enters a config mode which edits the running config shown by
+"show running-config".
+With --sftp-root the files of DIR are served over SFTP and SCP, running-config and
+startup-config are written there from the outputs of the show commands.
+"""
+import argparse
+import asyncio
+import os
+
+import asyncssh
+
+from corpus import PROFILES, profile_outputs
+from napalm_eltex.confdiff import compress_vlans, expand_vlans, negate, split_sections
+from napalm_eltex.replay import ReplayDevice
+
+# команды конфигурации, открывающие секцию с вложенными командами
+SECTION_COMMANDS = ('interface ', 'vlan database', 'line ', 'router ', 'ip access-list ', 'spanning-tree mst ')
+
+
+class SimulatedSwitch(object):
+    """Canned outputs and latencies of one simulated switch."""
+
+    def __init__(self, outputs, hostname='sw-sim', latency=0.0, command_latency=None):
+        self.device = outputs if isinstance(outputs, ReplayDevice) else ReplayDevice(outputs)
+        self.hostname = hostname
+        self.latency = latency
+        self.command_latency = command_latency or {}
+        # running-config в виде секций, появляется после первой команды конфигурации
+        self.sections = None
+
+    def answer(self, command):
+        """Return (latency, output) of a command."""
+        latency = self.command_latency.get(command, self.latency)
+        if command in ('', 'terminal datadump', 'terminal width 0'):
+            return latency, ''
+        if command == 'show running-config' and self.sections is not None:
+            return latency, self.running_config()
+        try:
+            return latency, self.device.send_command(command)
+        except Exception:
+            return latency, '% Unrecognized command\n'
+
+    def running_config(self):
+        """Render the edited running config."""
+        lines = []
+        for (header, _), body in self.sections.items():
+            lines.append(header)
+            if body:
+                lines.extend(' ' + line for line in body)
+                lines.append('exit')
+            lines.append('!')
+        return '\n'.join(lines) + '\n'
+
+    def configure(self, mode, command):
+        """Apply a config mode command, mode is the current section key or None; return the new mode."""
+        if self.sections is None:
+            self.sections = split_sections(self.device.send_command('show running-config'))
+        if mode is not None:
+            # как коммутатор: списки VLAN хранятся диапазонами, "no" и "allowed vlan remove" убирают VLAN из них
+            body = self.sections[mode]
+            lines = expand_vlans(body)
+            if ' allowed vlan remove ' in command:
+                added = command.replace(' remove ', ' add ', 1)
+                gone = set(expand_vlans([added, added + ' tagged', added + ' untagged']))
+                lines = [line for line in lines if line not in gone]
+            elif command.startswith('no '):
+                gone = set(expand_vlans([negate(command)]))
+                lines = [line for line in lines if line not in gone]
+            else:
+                present = set(lines)
+                lines.extend(line for line in expand_vlans([command]) if line not in present)
+            body[:] = compress_vlans(lines)
+            return mode
+        key = (command, 1)
+        if command.startswith(SECTION_COMMANDS) or self.sections.get(key):
+            self.sections.setdefault(key, [])
+            return key
+        if command.startswith('no '):
+            self.sections.pop((negate(command), 1), None)
+        else:
+            self.sections.setdefault(key, [])
+        return None
+
+    async def shell(self, process):
+        """Interactive CLI session: echo, output, prompt."""
+        prompt = self.hostname + '#'
+        # None - exec, () - config, ключ секции - внутри секции
+        mode = None
+        process.stdout.write('\r\n' + prompt)
+        buffer = ''
+        while True:
+            try:
+                data = await process.stdin.read(4096)
+            except (asyncssh.BreakReceived, asyncssh.TerminalSizeChanged):
+                continue
+            except Exception:
+                break
+            if not data:
+                break
+            buffer += data.replace('\r\n', '\n').replace('\r', '\n')
+            while '\n' in buffer:
+                command, buffer = buffer.split('\n', 1)
+                command = command.strip()
+                process.stdout.write(command + '\r\n')
+                if mode is not None:
+                    if command == 'end' or (command == 'exit' and mode == ()):
+                        mode = None
+                    elif command == 'exit':
+                        mode = ()
+                    elif command:
+                        mode = self.configure(mode or None, command) or ()
+                    prompt = self.hostname + ('#' if mode is None else '(config)#' if mode == () else '(config-if)#')
+                    process.stdout.write(prompt)
+                    continue
+                if command in ('configure', 'configure terminal'):
+                    mode = ()
+                    process.stdout.write(self.hostname + '(config)#')
+                    continue
+                if command in ('exit', 'logout'):
+                    process.exit(0)
+                    return
+                latency, output = self.answer(command)
+                if latency:
+                    await asyncio.sleep(latency)
+                if output:
+                    process.stdout.write(output.replace('\n', '\r\n'))
+                    if not output.endswith('\n'):
+                        process.stdout.write('\r\n')
+                process.stdout.write(prompt)
+        process.exit(0)
+
+
+class _Server(asyncssh.SSHServer):
+
+    def __init__(self, password):
+        self.password = password
+
+    def begin_auth(self, username):
+        return True
+
+    def password_auth_supported(self):
+        return True
+
+    def validate_password(self, username, password):
+        return password == self.password
+
+
+def write_config_files(switch, directory):
+    """Write running-config and startup-config of the switch into directory."""
+    for name in ('running-config', 'startup-config'):
+        with open(os.path.join(directory, name), 'w', encoding='utf-8') as fs:
+            fs.write(switch.answer('show ' + name)[1])
+
+
+async def start_server(switch, host='127.0.0.1', port=8022, password='admin', host_key=None, sftp_root=None):
+    """Start serving the simulated switch, return the asyncssh server."""
+    if host_key is None:
+        host_key = asyncssh.generate_private_key('ssh-rsa')
+    root = os.path.abspath(sftp_root).encode() if sftp_root is not None else None
+    sftp_factory = (lambda chan: asyncssh.SFTPServer(chan, chroot=root)) if root is not None else None
+    return await asyncssh.create_server(
+        lambda: _Server(password), host, port,
+        server_host_keys=[host_key], process_factory=switch.shell, line_editor=False,
+        sftp_factory=sftp_factory, allow_scp=sftp_root is not None
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulated Eltex SSH CLI')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8022)
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--hostname', default='sw-sim')
+    parser.add_argument('--profile', default='mes2348_48port', choices=sorted(PROFILES))
+    parser.add_argument('--replay-dir', help='serve outputs from a replay directory instead of a profile')
+    for size in ('units', 'ports', 'vlans', 'macs', 'arps'):
+        parser.add_argument('--' + size, type=int, help='override {0} of the profile'.format(size))
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds before every answer')
+    parser.add_argument('--command-latency', action='append', default=[], metavar='COMMAND=SECONDS')
+    parser.add_argument('--sftp-root', help='serve files of this directory over SFTP/SCP')
+    args = parser.parse_args()
+
+    if args.replay_dir:
+        if not os.path.isdir(args.replay_dir):
+            parser.error('{0} is not a directory'.format(args.replay_dir))
+        outputs = ReplayDevice(directory=args.replay_dir)
+    else:
+        profile = dict(PROFILES[args.profile])
+        for size in ('units', 'ports', 'vlans', 'macs', 'arps'):
+            if getattr(args, size) is not None:
+                profile[size] = getattr(args, size)
+        outputs = profile_outputs(profile)
+
+    command_latency = {}
+    for item in args.command_latency:
+        command, _, seconds = item.rpartition('=')
+        command_latency[command.strip()] = float(seconds)
+
+    switch = SimulatedSwitch(outputs, hostname=args.hostname, latency=args.latency, command_latency=command_latency)
+    if args.sftp_root:
+        write_config_files(switch, args.sftp_root)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    loop.run_until_complete(start_server(switch, args.host, args.port, args.password, sftp_root=args.sftp_root))
+    print('Simulated Eltex listening on {0}:{1}'.format(args.host, args.port))
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
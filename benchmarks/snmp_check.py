@@ -0,0 +1,167 @@
+"""
+Run the SNMP backend getters against snmpsim serving benchmarks/snmp/public.snmprec.
+
+Usage:
+    python benchmarks/snmp_check.py [--agent HOST:PORT] [--rebuild]
+
+Without --agent the snmpsim command responder (pip install snmpsim) is started on a free
+local port. The fixture has 52 ports (48 gigabit, 4 uplinks), a VLAN interface the getters must skip and
+1000 FDB entries in 8 VLANs, every 50th of them static. --rebuild regenerates the
+fixture from corpus.py. Exits with status 1 if a result differs from the fixture.
+"""
+import argparse
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from corpus import interface_names, mac_address
+from napalm_eltex.snmp import SnmpBackend
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snmp', 'public.snmprec')
+PORTS = 48
+MACS = 1000
+VLANS = 8
+
+# snmpsim выбирает модуль dbm для индекса уже после сброса прав и без _gdbm не находит ни одного,
+# поэтому запускаем его из своего процесса, открыв dbm заранее
+AGENT = (
+    'import dbm, sys; dbm.open(sys.argv[1], "n").close(); '
+    'from snmpsim.commands.responder import main; sys.argv = sys.argv[1:]; sys.exit(main())'
+)
+
+
+def counter_value(if_index, column):
+    return 10614485844 + if_index * column
+
+
+def build_snmprec(path):
+    """Write the fixture: OID|type|value lines sorted by OID (2 Integer, 4 OctetString, 65 Counter32, 70 Counter64)."""
+    records = []
+
+    def add(oid, value_type, value):
+        records.append((tuple(int(item) for item in oid.split('.')), value_type, value))
+
+    for if_index, name in enumerate(interface_names(1, PORTS), 1):
+        add('1.3.6.1.2.1.2.2.1.3.{0}'.format(if_index), 2, 6)
+        add('1.3.6.1.2.1.31.1.1.1.1.{0}'.format(if_index), 4, name)
+        for column in (13, 14, 19, 20):
+            add('1.3.6.1.2.1.2.2.1.{0}.{1}'.format(column, if_index), 65, if_index)
+        for column in range(6, 14):
+            add('1.3.6.1.2.1.31.1.1.1.{0}.{1}'.format(column, if_index), 70, counter_value(if_index, column))
+        add('1.3.6.1.2.1.17.1.4.1.2.{0}'.format(if_index), 2, if_index)
+    # интерфейс VLAN (l3ipvlan), геттер счётчиков его пропускает
+    add('1.3.6.1.2.1.2.2.1.3.100001', 2, 136)
+    add('1.3.6.1.2.1.31.1.1.1.1.100001', 4, 'vlan1')
+    for index in range(MACS):
+        mac = '.'.join(str(int(octet, 16)) for octet in mac_address(index).split(':'))
+        row = '{0}.{1}'.format(index % VLANS + 1, mac)
+        add('1.3.6.1.2.1.17.7.1.2.2.1.2.' + row, 2, index % PORTS + 1)
+        add('1.3.6.1.2.1.17.7.1.2.2.1.3.' + row, 2, 3 if index % 50 else 5)
+    records.sort()
+    with open(path, 'w', encoding='utf-8') as fs:
+        for oid, value_type, value in records:
+            fs.write('{0}|{1}|{2}\n'.format('.'.join(map(str, oid)), value_type, value))
+
+
+def start_agent():
+    """Start snmpsim on a free port, return (process, port, data directory)."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    # snmpsim под root сбрасывает права до nobody, данные копируем туда, где он их прочитает
+    directory = tempfile.mkdtemp(prefix='snmpsim-')
+    os.chmod(directory, 0o755)
+    for name in ('data', 'cache'):
+        os.makedirs(os.path.join(directory, name))
+        os.chmod(os.path.join(directory, name), 0o777)
+    shutil.copy(FIXTURE, os.path.join(directory, 'data'))
+    command = [
+        sys.executable, '-c', AGENT, os.path.join(directory, 'cache', 'preload'),
+        '--data-dir=' + os.path.join(directory, 'data'),
+        '--cache-dir=' + os.path.join(directory, 'cache'), '--agent-udpv4-endpoint=127.0.0.1:{0}'.format(port)
+    ]
+    if hasattr(os, 'geteuid') and os.geteuid() == 0:
+        command += ['--process-user=nobody', '--process-group=nogroup']
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return process, port, directory
+
+
+def wait_agent(backend, seconds=30.0):
+    deadline = time.monotonic() + seconds
+    while True:
+        try:
+            return backend.walk('1.3.6.1.2.1.31.1.1.1.1')
+        except Exception:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.5)
+
+
+def check(backend):
+    """Return a list of differences between the getters and the fixture."""
+    errors = []
+    names = interface_names(1, PORTS)
+
+    started = time.monotonic()
+    counters = backend.get_interfaces_counters()
+    print('get_interfaces_counters: {0} interfaces, {1:.3f} s'.format(len(counters), time.monotonic() - started))
+    if sorted(counters) != sorted(names):
+        errors.append('interfaces: {0}'.format(sorted(set(counters) ^ set(names))))
+    first = counters.get(names[0], {})
+    if first.get('rx_discards') != 1 or first.get('rx_octets') != str(counter_value(1, 6)):
+        errors.append('counters of {0}: {1}'.format(names[0], first))
+    if list(backend.get_interfaces_counters(interfaces=[names[-1]])) != [names[-1]]:
+        errors.append('interfaces filter')
+
+    started = time.monotonic()
+    table = backend.get_mac_address_table()
+    print('get_mac_address_table: {0} entries, {1:.3f} s'.format(len(table), time.monotonic() - started))
+    if len(table) != MACS:
+        errors.append('MAC entries: {0}'.format(len(table)))
+    expected = {
+        mac_address(index): (str(index % VLANS + 1), names[index % PORTS], index % 50 == 0) for index in range(MACS)
+    }
+    for entry in table:
+        if expected.get(entry['mac']) != (entry['vlan'], entry['interface'], entry['static']):
+            errors.append('MAC entry: {0}'.format(entry))
+            break
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SNMP backend check against snmpsim')
+    parser.add_argument('--agent', help='HOST:PORT of a running agent serving the fixture')
+    parser.add_argument('--rebuild', action='store_true', help='regenerate the fixture and exit')
+    args = parser.parse_args()
+
+    if args.rebuild:
+        build_snmprec(FIXTURE)
+        return 0
+
+    process = directory = None
+    if args.agent:
+        host, port = args.agent.rsplit(':', 1)
+    else:
+        process, port, directory = start_agent()
+        host = '127.0.0.1'
+    backend = SnmpBackend(host, 'public', port=int(port))
+    try:
+        wait_agent(backend)
+        errors = check(backend)
+    finally:
+        backend.close()
+        if process is not None:
+            process.terminate()
+            process.wait()
+            shutil.rmtree(directory, ignore_errors=True)
+    for error in errors:
+        print('FAIL', error)
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
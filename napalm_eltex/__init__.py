@@ -1,4 +1,12 @@
 """napalm-eltex package."""
 from napalm_eltex.eltex import CEDriver
 
-__all__ = ('CEDriver',)
\ No newline at end of file
+__all__ = ('CEDriver', 'AsyncCEDriver')
+
+
+def __getattr__(name):
+    # AsyncCEDriver загружается при первом обращении
+    if name == 'AsyncCEDriver':
+        from napalm_eltex.aio import AsyncCEDriver
+        return AsyncCEDriver
+    raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name))
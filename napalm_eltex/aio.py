@@ -0,0 +1,187 @@
+"""
+Asyncio driver for Eltex switches.
+"""
+import asyncio
+import re
+
+from napalm.base.exceptions import (
+    CommandTimeoutException,
+    ConnectionException,
+)
+
+from napalm_eltex.eltex import CEDriver, GETTER_COMMANDS
+from napalm_eltex.replay import ReplayDevice
+
+RE_ANSI = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]')
+RE_PROMPT = re.compile(r'(?P<base_prompt>[^\r\n>#]+)[>#]\s*$')
+
+
+class AsyncCEDriver(object):
+    """
+    Asyncio variant of CEDriver on top of asyncssh.
+
+    Commands go through an interactive shell of a single SSH session, their outputs
+    are parsed by the CEDriver getters, so results are exactly the same.
+    """
+
+    def __init__(self, hostname, username, password, timeout=60, optional_args=None):
+        """Eltex asyncio handler."""
+        self.hostname = hostname
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+
+        if optional_args is None:
+            optional_args = {}
+        self.optional_args = optional_args
+        self.port = optional_args.get('port', 22)
+        # None отключает проверку ключа хоста, как ssh_strict=False у netmiko
+        self.known_hosts = optional_args.get('known_hosts', None)
+
+        self.conn = None
+        self.process = None
+        self.base_prompt = ''
+        self._re_prompt = RE_PROMPT
+        self._lock = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback):
+        await self.close()
+
+    async def open(self):
+        """Open a connection to the device."""
+        # asyncssh импортируется только при подключении, синхронному драйверу он не нужен
+        try:
+            import asyncssh
+        except ImportError:
+            raise ConnectionException('AsyncCEDriver requires asyncssh')
+        self._lock = asyncio.Lock()
+        try:
+            self.conn = await asyncio.wait_for(
+                asyncssh.connect(self.hostname, port=self.port, username=self.username, password=self.password,
+                                 known_hosts=self.known_hosts),
+                self.timeout
+            )
+            # широкий терминал, чтобы устройство не переносило длинные строки
+            self.process = await self.conn.create_process(term_type='vt100', term_size=(511, 24))
+            greeting = await self._read_until_prompt()
+        except (OSError, asyncssh.Error, asyncio.TimeoutError, CommandTimeoutException) as err:
+            raise ConnectionException('Cannot connect to {0}. {1}'.format(self.hostname, err))
+
+        self.base_prompt = RE_PROMPT.search(self._normalize(greeting)).group('base_prompt').strip()
+        self._re_prompt = re.compile(re.escape(self.base_prompt) + r'[^\r\n]*[>#]\s*$')
+        await self.send_command('terminal datadump')
+
+    async def close(self):
+        """Close the connection to the device."""
+        if self.conn is not None:
+            self.conn.close()
+            await self.conn.wait_closed()
+        self.conn = None
+        self.process = None
+
+    async def is_alive(self):
+        """Return a flag with the state of the SSH connection."""
+        return {
+            'is_alive': self.process is not None and not self.process.stdout.at_eof()
+        }
+
+    @staticmethod
+    def _normalize(output):
+        return RE_ANSI.sub('', output).replace('\r\n', '\n').replace('\r', '')
+
+    async def _read_until_prompt(self):
+        """Read the shell output up to the next prompt."""
+        chunks = []
+        tail = ''
+        while True:
+            try:
+                chunk = await asyncio.wait_for(self.process.stdout.read(65536), self.timeout)
+            except asyncio.TimeoutError:
+                raise CommandTimeoutException('Timeout waiting for prompt from {0}'.format(self.hostname))
+            if not chunk:
+                raise ConnectionException('Connection to {0} closed'.format(self.hostname))
+            chunks.append(chunk)
+            tail = (tail + chunk)[-512:]
+            if self._re_prompt.search(tail):
+                return ''.join(chunks)
+
+    async def send_command(self, command):
+        """Send a command to the device and return its output without echo and prompt."""
+        if self.process is None:
+            raise ConnectionException('Not connected to {0}'.format(self.hostname))
+        async with self._lock:
+            self.process.stdin.write(command + '\n')
+            output = await self._read_until_prompt()
+
+        lines = self._normalize(output).split('\n')
+        # первая строка - эхо команды, последняя - приглашение
+        if lines and command in lines[0]:
+            lines.pop(0)
+        if lines:
+            lines.pop()
+        return '\n'.join(lines)
+
+    async def cli(self, commands):
+        """Execute raw CLI commands and returns their output."""
+        if type(commands) is not list:
+            raise TypeError('Please enter a valid list of commands!')
+
+        cli_output = {}
+        for command in commands:
+            cli_output[str(command)] = await self.send_command(command)
+        return cli_output
+
+    def _parse(self, getter, outputs, *args, **kwargs):
+        """Run a CEDriver getter over already collected command outputs."""
+        driver = CEDriver(self.hostname, self.username, self.password, timeout=self.timeout)
+        driver.device = ReplayDevice(outputs)
+        return getattr(driver, getter)(*args, **kwargs)
+
+    async def _run_getter(self, getter, *args, **kwargs):
+        outputs = {}
+        for command in GETTER_COMMANDS[getter]:
+            outputs[command] = await self.send_command(command)
+        return self._parse(getter, outputs, *args, **kwargs)
+
+    async def get_facts(self):
+        """Return a set of facts from the devices."""
+        return await self._run_getter('get_facts')
+
+    async def get_interfaces(self):
+        """Get interface details."""
+        return await self._run_getter('get_interfaces')
+
+    async def get_interfaces_ip(self):
+        """Get interface IP details."""
+        return await self._run_getter('get_interfaces_ip')
+
+    async def get_interfaces_counters(self):
+        """Return interfaces counters."""
+        return await self._run_getter('get_interfaces_counters')
+
+    async def get_arp_table(self, vrf=''):
+        """Get arp table information."""
+        if vrf:
+            raise NotImplementedError('VRF support has not been implemented.')
+        return await self._run_getter('get_arp_table')
+
+    async def get_lldp_neighbors(self):
+        """Return LLDP neighbors details."""
+        return await self._run_getter('get_lldp_neighbors')
+
+    async def get_mac_address_table(self):
+        """Return the MAC address table."""
+        return await self._run_getter('get_mac_address_table')
+
+    async def get_config(self, retrieve='all', full=False, sanitized=False):
+        """Get config from device."""
+        outputs = {}
+        if retrieve.lower() in ('running', 'all'):
+            outputs['show running-config'] = await self.send_command('show running-config')
+        if retrieve.lower() in ('startup', 'all'):
+            outputs['show startup-config'] = await self.send_command('show startup-config')
+        return self._parse('get_config', outputs, retrieve=retrieve, full=full, sanitized=sanitized)
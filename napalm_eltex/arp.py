@@ -0,0 +1,105 @@
+"""
+Indexed ARP table snapshot.
+"""
+import socket
+from array import array
+
+
+def ip_to_int(ip):
+    """Return an IPv4 address as an integer."""
+    return int.from_bytes(socket.inet_aton(ip), 'big')
+
+
+def mac_to_int(mac):
+    """Return a MAC address in any of the aa:bb:cc:dd:ee:ff, aa-bb-..., aabb.ccdd.eeff notations as an integer."""
+    digits = mac.replace(':', '')
+    if len(digits) != 12:
+        digits = digits.replace('-', '').replace('.', '')
+    if len(digits) != 12:
+        raise ValueError('Invalid MAC address {0}'.format(mac))
+    return int(digits, 16)
+
+
+def int_to_mac(value):
+    """Return a MAC address integer as aa:bb:cc:dd:ee:ff."""
+    digits = '{0:012x}'.format(value)
+    return ':'.join(digits[index:index + 2] for index in range(0, 12, 2))
+
+
+class ArpTable(object):
+    """
+    ARP entries of one device with lookups by IP and by MAC.
+
+    Entries are kept in parallel arrays (IP and MAC as integers, interface as an
+    index into the list of interface names), the indexes map an IP to its row and
+    a MAC to its row, or to the list of its rows if the MAC has several IPs.
+    Iterating yields get_arp_table dictionaries.
+    """
+
+    def __init__(self, entries=None):
+        self._ips = array('I')
+        self._macs = array('Q')
+        self._interfaces = array('H')
+        self._names = []
+        self._name_index = {}
+        self._by_ip = {}
+        self._by_mac = {}
+        for entry in entries or ():
+            self.add(entry['interface'], entry['mac'], entry['ip'])
+
+    def add(self, interface, mac, ip):
+        """Add an entry, a later entry for the same IP replaces the index of the earlier one."""
+        name = self._name_index.get(interface)
+        if name is None:
+            name = self._name_index[interface] = len(self._names)
+            self._names.append(interface)
+        row = len(self._ips)
+        ip = ip_to_int(ip)
+        mac = mac_to_int(mac)
+        self._ips.append(ip)
+        self._macs.append(mac)
+        self._interfaces.append(name)
+        self._by_ip[ip] = row
+        rows = self._by_mac.get(mac)
+        if rows is None:
+            self._by_mac[mac] = row
+        elif isinstance(rows, list):
+            rows.append(row)
+        else:
+            self._by_mac[mac] = [rows, row]
+
+    def _entry(self, row):
+        return {
+            'interface': self._names[self._interfaces[row]],
+            'mac': int_to_mac(self._macs[row]),
+            'ip': socket.inet_ntoa(self._ips[row].to_bytes(4, 'big')),
+            'age': -1
+        }
+
+    def lookup_ip(self, ip):
+        """Return the entry of an IP address or None."""
+        row = self._by_ip.get(ip_to_int(ip))
+        return self._entry(row) if row is not None else None
+
+    def lookup_mac(self, mac):
+        """Return the list of entries of a MAC address."""
+        rows = self._by_mac.get(mac_to_int(mac))
+        if rows is None:
+            return []
+        if not isinstance(rows, list):
+            rows = [rows]
+        return [self._entry(row) for row in rows]
+
+    def __contains__(self, ip):
+        return ip_to_int(ip) in self._by_ip
+
+    def __len__(self):
+        return len(self._ips)
+
+    def __iter__(self):
+        for row in range(len(self._ips)):
+            yield self._entry(row)
+
+    def to_list(self):
+        """Return the entries as the get_arp_table list."""
+        return list(self)
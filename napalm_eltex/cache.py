@@ -0,0 +1,101 @@
+"""
+Per-session command output cache and on-disk facts cache.
+"""
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+
+
+class CommandCache(object):
+    """
+    LRU cache of "show ..." outputs keyed by command string.
+
+    Entries expire after ``ttl`` seconds, at most ``maxsize`` outputs are kept.
+    """
+
+    def __init__(self, ttl=30.0, maxsize=32):
+        self.ttl = float(ttl)
+        self.maxsize = int(maxsize)
+        self._data = OrderedDict()
+
+    def get(self, command):
+        """Return cached output for command or None if it is missing or expired."""
+        entry = self._data.get(command)
+        if entry is None:
+            return None
+        stamp, output = entry
+        if self.ttl >= 0 and time.monotonic() - stamp > self.ttl:
+            del self._data[command]
+            return None
+        self._data.move_to_end(command)
+        return output
+
+    def set(self, command, output):
+        """Store output of command, evicting the least recently used entry."""
+        if self.maxsize <= 0:
+            return
+        self._data[command] = (time.monotonic(), output)
+        self._data.move_to_end(command)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, command=None):
+        """Drop one command from the cache, or everything if command is None."""
+        if command is None:
+            self._data.clear()
+        else:
+            self._data.pop(command, None)
+
+    def __contains__(self, command):
+        return self.get(command) is not None
+
+    def __len__(self):
+        return len(self._data)
+
+
+class FactsCache(object):
+    """
+    get_facts results stored on disk, one JSON file per device.
+
+    A stored result is valid while the device boot time computed from its uptime
+    (wall clock minus uptime) stays within ``slack`` seconds of the stored one,
+    i.e. until the device reboots.
+    """
+
+    def __init__(self, directory, slack=60.0):
+        self.directory = directory
+        self.slack = float(slack)
+
+    def path(self, key):
+        """Return the file facts of a device are stored in."""
+        name = re.sub(r'[^\w.-]', '_', key)
+        return os.path.join(self.directory, name + '.json')
+
+    def get(self, key, uptime, now=None):
+        """Return stored facts of the device if it has not rebooted since, else None."""
+        if uptime is None or uptime < 0:
+            return None
+        try:
+            with open(self.path(key), 'r', encoding='utf-8') as fs:
+                entry = json.load(fs)
+        except (OSError, ValueError):
+            return None
+        now = time.time() if now is None else now
+        if abs((now - uptime) - entry.get('boot_time', 0)) > self.slack:
+            return None
+        return entry.get('facts')
+
+    def set(self, key, facts, now=None):
+        """Store facts of the device, written to a temporary file and renamed over the old one."""
+        if facts.get('uptime', -1) < 0:
+            return
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        now = time.time() if now is None else now
+        path = self.path(key)
+        tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+        with open(tmp_path, 'w', encoding='utf-8') as fs:
+            json.dump({'boot_time': now - facts['uptime'], 'facts': facts}, fs)
+        os.replace(tmp_path, path)
@@ -0,0 +1,286 @@
+"""
+Columnar results of get_mac_address_table, get_arp_table and get_interfaces_counters.
+
+The parser appends straight to typed arrays (array.array), one chunk per device.
+Tables of many devices are concatenated by chunk lists, column data is not copied.
+Arrays support the buffer protocol, so numpy.frombuffer() wraps a column without a
+copy, to_arrow() builds a pyarrow.Table (needs pyarrow) over the same buffers.
+"""
+import socket
+import sys
+from array import array
+
+from napalm_eltex.arp import int_to_mac, mac_to_int
+from napalm_eltex.counters import COUNTER_FIELDS, INTEGER_COUNTERS
+
+# строки, закодированные словарём: в колонке индексы 'H', сами строки в chunk.dictionaries
+DICTIONARY = 'dictionary'
+# строки как есть, список
+STRING = 'string'
+
+ARROW_TYPES = {1: 'uint8', 2: 'uint16', 4: 'uint32', 8: 'uint64'}
+
+
+def extend_macs(column, macs):
+    """Append MAC address strings to an array('Q'), aa:bb:cc:dd:ee:ff addresses are converted in one pass."""
+    if set(map(len, macs)) == {17}:
+        # каждый адрес дополняем до 8 байт big-endian и разбираем весь список одним bytes.fromhex
+        digits = ('0000' + '0000'.join(macs)).replace(':', '')
+        if len(digits) == 16 * len(macs):
+            try:
+                data = bytes.fromhex(digits)
+            except ValueError:
+                pass
+            else:
+                values = array('Q', data)
+                if sys.byteorder == 'little':
+                    values.byteswap()
+                column.frombytes(values.tobytes())
+                return
+    column.extend(map(mac_to_int, macs))
+
+
+def extend_ips(column, ips):
+    """Append IPv4 address strings to an array('I')."""
+    values = array('I', b''.join(map(socket.inet_aton, ips)))
+    if sys.byteorder == 'little':
+        values.byteswap()
+    column.frombytes(values.tobytes())
+
+
+class Chunk(object):
+    """Columns of one device: {name: array or list} and the strings of dictionary-encoded columns."""
+
+    __slots__ = ('device', 'columns', 'dictionaries', 'codes', 'rows')
+
+    def __init__(self, device, fields):
+        self.device = device
+        self.columns = {}
+        self.dictionaries = {}
+        self.codes = {}
+        # номер строки по ключу для таблиц с поиском по ключу (CounterColumns)
+        self.rows = {}
+        for name, typecode in fields:
+            if typecode == STRING:
+                self.columns[name] = []
+            elif typecode == DICTIONARY:
+                self.columns[name] = array('H')
+                self.dictionaries[name] = []
+                self.codes[name] = {}
+            else:
+                self.columns[name] = array(typecode)
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+    def extend_codes(self, name, values):
+        """Append strings to a dictionary-encoded column."""
+        codes = self.codes[name]
+        self.columns[name].fromlist([codes.setdefault(value, len(codes)) for value in values])
+        self.dictionaries[name].extend(list(codes)[len(self.dictionaries[name]):])
+
+    def decode(self, name, index):
+        return self.dictionaries[name][self.columns[name][index]]
+
+
+class ColumnTable(object):
+    """
+    Columnar getter result: a list of per-device chunks with the columns of FIELDS.
+
+    Iterating yields rows as NAPALM dicts, to_napalm() returns the getter result.
+    """
+
+    FIELDS = ()
+
+    def __init__(self, device=None, chunks=None):
+        self.chunks = chunks if chunks is not None else [Chunk(device, self.FIELDS)]
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self.chunks)
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            for index in range(len(chunk)):
+                yield self._row(chunk, index)
+
+    def _row(self, chunk, index):
+        raise NotImplementedError
+
+    def to_napalm(self):
+        """Return the rows in the format of the dict getter."""
+        return list(self)
+
+    def column(self, name):
+        """
+        Return a whole column: an array (the chunk array itself for one chunk) or a list of strings.
+
+        Dictionary-encoded columns are decoded to a list.
+        """
+        typecode = dict(self.FIELDS)[name]
+        if typecode == DICTIONARY:
+            return [chunk.decode(name, index) for chunk in self.chunks for index in range(len(chunk))]
+        if len(self.chunks) == 1:
+            return self.chunks[0].columns[name]
+        result = [] if typecode == STRING else array(typecode)
+        for chunk in self.chunks:
+            result.extend(chunk.columns[name])
+        return result
+
+    def devices(self):
+        """Return the device column as a list."""
+        return [chunk.device for chunk in self.chunks for _ in range(len(chunk))]
+
+    def to_arrow(self):
+        """
+        Return a pyarrow.Table with a 'device' column, one record batch per chunk.
+
+        Numeric columns share their buffers with the arrays, dictionary-encoded
+        columns become arrow dictionary arrays.
+        """
+        # pyarrow тянет за собой numpy, импортируем только при экспорте
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError('to_arrow() requires pyarrow')
+        batches = []
+        for chunk in self.chunks:
+            size = len(chunk)
+            arrays = [pyarrow.repeat(pyarrow.scalar(chunk.device, type=pyarrow.string()), size).dictionary_encode()]
+            for name, typecode in self.FIELDS:
+                column = chunk.columns[name]
+                if typecode == STRING:
+                    arrays.append(pyarrow.array(column, type=pyarrow.string()))
+                    continue
+                values = pyarrow.Array.from_buffers(
+                    getattr(pyarrow, ARROW_TYPES[column.itemsize])(), size, [None, pyarrow.py_buffer(column)])
+                if typecode == DICTIONARY:
+                    values = pyarrow.DictionaryArray.from_arrays(
+                        values, pyarrow.array(chunk.dictionaries[name], type=pyarrow.string()))
+                arrays.append(values)
+            batches.append(pyarrow.RecordBatch.from_arrays(arrays, ['device'] + [name for name, _ in self.FIELDS]))
+        return pyarrow.Table.from_batches(batches)
+
+
+def concat(tables):
+    """Concatenate tables of one getter (e.g. of many devices) without copying column data."""
+    tables = list(tables)
+    if not tables:
+        raise ValueError('No tables to concatenate')
+    cls = type(tables[0])
+    if any(type(table) is not cls for table in tables):
+        raise TypeError('Cannot concatenate tables of different getters')
+    return cls(chunks=[chunk for table in tables for chunk in table.chunks])
+
+
+class MacColumns(ColumnTable):
+    """get_mac_address_table: VLAN as a number, MAC as a 48-bit integer."""
+
+    FIELDS = (('vlan', 'H'), ('mac', 'Q'), ('interface', DICTIONARY), ('static', 'B'))
+
+    def append(self, vlan, mac, interface, static):
+        self.extend(((vlan, mac, interface, static),))
+
+    def extend(self, rows):
+        """Append (vlan, mac, interface, static) rows to the last chunk."""
+        rows = list(rows)
+        if not rows:
+            return
+        chunk = self.chunks[-1]
+        vlans, macs, interfaces, statics = zip(*rows)
+        # VLAN повторяются, каждое значение переводим в число один раз
+        vlan_ids = {vlan: int(vlan) for vlan in set(vlans)}
+        chunk.columns['vlan'].fromlist(list(map(vlan_ids.__getitem__, vlans)))
+        extend_macs(chunk.columns['mac'], macs)
+        chunk.extend_codes('interface', interfaces)
+        chunk.columns['static'].frombytes(bytes(statics))
+
+    def _row(self, chunk, index):
+        return {
+            'active': True,
+            'interface': chunk.decode('interface', index),
+            'last_move': -1.0,
+            'mac': int_to_mac(chunk.columns['mac'][index]),
+            'moves': -1,
+            'static': bool(chunk.columns['static'][index]),
+            'vlan': str(chunk.columns['vlan'][index])
+        }
+
+
+class ArpColumns(ColumnTable):
+    """get_arp_table: IP as a 32-bit integer, MAC as a 48-bit integer."""
+
+    FIELDS = (('interface', DICTIONARY), ('mac', 'Q'), ('ip', 'I'))
+
+    def append(self, interface, mac, ip):
+        self.extend(((interface, mac, ip),))
+
+    def extend(self, rows):
+        """Append (interface, mac, ip) rows to the last chunk."""
+        rows = list(rows)
+        if not rows:
+            return
+        chunk = self.chunks[-1]
+        interfaces, macs, ips = zip(*rows)
+        chunk.extend_codes('interface', interfaces)
+        extend_macs(chunk.columns['mac'], macs)
+        extend_ips(chunk.columns['ip'], ips)
+
+    def _row(self, chunk, index):
+        ip = chunk.columns['ip'][index]
+        return {
+            'interface': chunk.decode('interface', index),
+            'mac': int_to_mac(chunk.columns['mac'][index]),
+            'ip': '.'.join(str(ip >> shift & 255) for shift in (24, 16, 8, 0)),
+            'age': -1
+        }
+
+
+class CounterRow(object):
+    """Read-write view of the counters of one interface in a CounterColumns chunk."""
+
+    __slots__ = ('chunk', 'index')
+
+    def __init__(self, chunk, index):
+        self.chunk = chunk
+        self.index = index
+
+    def __getitem__(self, field):
+        return self.chunk.columns[field][self.index]
+
+    def __setitem__(self, field, value):
+        self.chunk.columns[field][self.index] = int(value)
+
+
+class CounterColumns(ColumnTable):
+    """get_interfaces_counters: one row per interface, counters as unsigned 64-bit integers."""
+
+    FIELDS = (('interface', STRING),) + tuple((field, 'Q') for field in COUNTER_FIELDS)
+
+    def add(self, interface, **counters):
+        """Add an interface, counters missing from the arguments are 0."""
+        chunk = self.chunks[-1]
+        chunk.rows[interface] = len(chunk.columns['interface'])
+        chunk.columns['interface'].append(interface)
+        for field in COUNTER_FIELDS:
+            chunk.columns[field].append(int(counters.get(field) or 0))
+
+    def __getitem__(self, interface):
+        for chunk in self.chunks:
+            index = chunk.rows.get(interface)
+            if index is not None:
+                return CounterRow(chunk, index)
+        raise KeyError(interface)
+
+    def _row(self, chunk, index):
+        row = {'interface': chunk.columns['interface'][index]}
+        for field in COUNTER_FIELDS:
+            value = chunk.columns[field][index]
+            row[field] = value if field in INTEGER_COUNTERS else str(value)
+        return row
+
+    def to_napalm(self):
+        """Return {interface: counters} as get_interfaces_counters (interfaces of all chunks in one dict)."""
+        result = {}
+        for row in self:
+            result[row.pop('interface')] = row
+        return result
@@ -0,0 +1,287 @@
+"""
+Section-aware diff of Eltex configurations.
+
+A configuration is split into top-level sections: a line at column 0 with the
+indented lines below it ("interface gi1/0/1" with its body up to "exit"). Sections
+are compared by hash first, only sections whose hashes differ are diffed line by line.
+"""
+import difflib
+import re
+from collections import OrderedDict
+
+# строки, не влияющие на конфигурацию
+SKIP_LINES = ('', '!', 'exit')
+
+# строка со списком VLAN: "vlan 2-10,3000", "switchport general allowed vlan add 10,20 tagged"
+RE_VLAN_LIST = re.compile(
+    r'^(?P<prefix>.*\bvlan(?: add| remove)?) (?P<vlans>\d+(?:-\d+)?(?:,\d+(?:-\d+)?)*)(?P<suffix>(?: \D\S*)*)$'
+)
+RE_ALLOWED_VLAN_ADD = re.compile(r'^(?P<prefix>switchport \S+ allowed vlan) add (?P<vlans>\S+)')
+
+
+def split_sections(config):
+    """
+    Return an OrderedDict {(header, occurrence): [body lines]} of the top-level sections of a config.
+
+    occurrence counts repeated headers from 1. The "config-file-header" block up to
+    the "@" line, comments and "exit" lines are dropped.
+    """
+    sections = OrderedDict()
+    body = None
+    lines = config.splitlines()
+    if lines and lines[0].strip() == 'config-file-header':
+        for index, line in enumerate(lines):
+            if line.strip() == '@':
+                lines = lines[index + 1:]
+                break
+
+    for line in lines:
+        line = line.rstrip()
+        if line.strip() in SKIP_LINES:
+            continue
+        if line[0] in ' \t':
+            if body is not None:
+                body.append(line.strip())
+            continue
+        occurrence = 1
+        while (line, occurrence) in sections:
+            occurrence += 1
+        body = sections[line, occurrence] = []
+    return sections
+
+
+def vlan_ids(vlans):
+    """Return the VLAN ids of a VLAN list: '2-4,10' -> [2, 3, 4, 10]."""
+    ids = []
+    for item in vlans.split(','):
+        first, _, last = item.partition('-')
+        ids.extend(range(int(first), int(last or first) + 1))
+    return ids
+
+
+def vlan_ranges(vlans):
+    """Return VLAN ids as a VLAN list in the Eltex format: [10, 2, 3, 4] -> '2-4,10'."""
+    ranges = []
+    for vlan in sorted(set(vlans)):
+        if ranges and ranges[-1][1] == vlan - 1:
+            ranges[-1][1] = vlan
+        else:
+            ranges.append([vlan, vlan])
+    return ','.join(str(first) if first == last else '{0}-{1}'.format(first, last) for first, last in ranges)
+
+
+def expand_vlans(lines):
+    """Return lines with VLAN lists split into one line per VLAN ("vlan 2-4" -> "vlan 2", "vlan 3", "vlan 4")."""
+    result = []
+    for line in lines:
+        match = RE_VLAN_LIST.match(line)
+        if match is None:
+            result.append(line)
+            continue
+        result.extend('{0} {1}{2}'.format(match.group('prefix'), vlan, match.group('suffix'))
+                      for vlan in vlan_ids(match.group('vlans')))
+    return result
+
+
+def compress_vlans(lines):
+    """
+    Merge lines differing only in the VLAN list into one line, the reverse of expand_vlans().
+
+    The merged line takes the place of the first of them.
+    """
+    result = []
+    groups = OrderedDict()
+    for line in lines:
+        match = RE_VLAN_LIST.match(line)
+        if match is None:
+            result.append(line)
+            continue
+        key = match.group('prefix'), match.group('suffix')
+        if key not in groups:
+            groups[key] = (len(result), [])
+            result.append(None)
+        groups[key][1].extend(vlan_ids(match.group('vlans')))
+    for (prefix, suffix), (index, vlans) in groups.items():
+        result[index] = '{0} {1}{2}'.format(prefix, vlan_ranges(vlans), suffix)
+    return result
+
+
+def section_hashes(sections):
+    """Return {key: hash of the section body} for split_sections() output (valid within one process)."""
+    return {key: hash(tuple(body)) for key, body in sections.items()}
+
+
+def _expand_sections(sections):
+    """Expand VLAN lists of split_sections() output: in bodies and in top-level lines without a body."""
+    result = OrderedDict()
+    for (header, occurrence), body in sections.items():
+        if body:
+            result[header, occurrence] = expand_vlans(body)
+        else:
+            for line in expand_vlans([header]):
+                result.setdefault((line, occurrence), [])
+    return result
+
+
+def _flush_diff(diff, sign, lines):
+    """Append pending diff lines with one sign to diff with VLAN lists merged back, clear them."""
+    diff.extend(sign + line for line in compress_vlans(lines))
+    del lines[:]
+
+
+def diff_configs(running, candidate):
+    """
+    Return the diff turning running into candidate, '' if they are equal.
+
+    Added and removed sections are printed whole with "+"/"-" prefixes, changed
+    sections as their header followed by the changed body lines. VLAN lists are
+    compared by VLAN ("vlan 2-10" equals "vlan 2-6,7,8-10").
+    """
+    running_sections = _expand_sections(split_sections(running))
+    candidate_sections = _expand_sections(split_sections(candidate))
+    running_hashes = section_hashes(running_sections)
+    candidate_hashes = section_hashes(candidate_sections)
+
+    diff = []
+    # соседние строки верхнего уровня без тела выводятся одной строкой со списком VLAN
+    lines = []
+    for key, body in candidate_sections.items():
+        if key not in running_sections:
+            if not body:
+                lines.append(key[0])
+                continue
+            _flush_diff(diff, '+', lines)
+            diff.append('+' + key[0])
+            _flush_diff(diff, '+ ', list(body))
+        elif candidate_hashes[key] != running_hashes[key]:
+            _flush_diff(diff, '+', lines)
+            diff.append(' ' + key[0])
+            changed = []
+            sign = None
+            for line in difflib.unified_diff(running_sections[key], body, lineterm='', n=0):
+                if line[:1] not in ('+', '-') or line[:3] in ('---', '+++'):
+                    continue
+                if line[0] != sign and changed:
+                    _flush_diff(diff, sign + ' ', changed)
+                sign = line[0]
+                changed.append(line[1:])
+            if changed:
+                _flush_diff(diff, sign + ' ', changed)
+    _flush_diff(diff, '+', lines)
+    for key, body in running_sections.items():
+        if key not in candidate_sections:
+            if not body:
+                lines.append(key[0])
+                continue
+            _flush_diff(diff, '-', lines)
+            diff.append('-' + key[0])
+            _flush_diff(diff, '- ', list(body))
+    _flush_diff(diff, '-', lines)
+    return '\n'.join(diff)
+
+
+def merge_diff(running, candidate):
+    """
+    Return lines of candidate missing from running, grouped under their section headers.
+
+    This is what merging candidate into running changes: nothing is removed.
+    VLAN lists are compared by VLAN ("vlan 5" is in "vlan 2-10").
+    """
+    running_sections = _expand_sections(split_sections(running))
+    candidate_sections = _expand_sections(split_sections(candidate))
+    running_hashes = section_hashes(running_sections)
+    candidate_hashes = section_hashes(candidate_sections)
+
+    diff = []
+    lines = []
+    for key, body in candidate_sections.items():
+        if key not in running_sections:
+            if not body:
+                lines.append(key[0])
+                continue
+            _flush_diff(diff, '+', lines)
+            diff.append('+' + key[0])
+            _flush_diff(diff, '+ ', list(body))
+        elif candidate_hashes[key] != running_hashes[key]:
+            present = set(running_sections[key])
+            added = [line for line in body if line not in present]
+            if added:
+                _flush_diff(diff, '+', lines)
+                diff.append(' ' + key[0])
+                _flush_diff(diff, '+ ', added)
+    _flush_diff(diff, '+', lines)
+    return '\n'.join(diff)
+
+
+def negate(line):
+    """Return the command removing a config line."""
+    if line.startswith('no '):
+        return line[3:]
+    # VLAN из разрешённых на порту убирает "remove", а не "no"
+    match = RE_ALLOWED_VLAN_ADD.match(line)
+    if match is not None:
+        return '{0} remove {1}'.format(match.group('prefix'), match.group('vlans'))
+    return 'no ' + line
+
+
+def _flush_lines(commands, lines, negated=False):
+    """Append pending top-level lines to commands with VLAN lists merged back, clear them."""
+    for line in compress_vlans(lines):
+        commands.append(negate(line) if negated else line)
+    del lines[:]
+
+
+def push_commands(running, candidate, replace=False):
+    """
+    Return CLI commands (in config mode) turning running into candidate.
+
+    A merge (replace=False) only adds what candidate has and running does not.
+    A replace also negates lines and sections missing from candidate: a removed
+    section with a body is entered and its lines negated, a removed global line
+    is negated. VLAN lists are compared by VLAN ("vlan 2-10" has "vlan 5"),
+    commands carry VLAN lists again ("no vlan 6-10").
+    """
+    running_sections = _expand_sections(split_sections(running))
+    candidate_sections = _expand_sections(split_sections(candidate))
+    running_hashes = section_hashes(running_sections)
+    candidate_hashes = section_hashes(candidate_sections)
+
+    commands = []
+    # соседние строки верхнего уровня без тела собираются в одну команду со списком VLAN
+    lines = []
+    for key, body in candidate_sections.items():
+        if key not in running_sections:
+            if not body:
+                lines.append(key[0])
+                continue
+            _flush_lines(commands, lines)
+            commands.append(key[0])
+            commands.extend(compress_vlans(body))
+            commands.append('exit')
+        elif candidate_hashes[key] != running_hashes[key]:
+            present = set(running_sections[key])
+            wanted = set(body)
+            removed = []
+            if replace:
+                removed = [negate(line) for line in
+                           compress_vlans([line for line in running_sections[key] if line not in wanted])]
+            added = compress_vlans([line for line in body if line not in present])
+            if removed or added:
+                _flush_lines(commands, lines)
+                commands.append(key[0])
+                commands.extend(removed + added)
+                commands.append('exit')
+    _flush_lines(commands, lines)
+    if replace:
+        for key, body in running_sections.items():
+            if key in candidate_sections:
+                continue
+            if not body:
+                lines.append(key[0])
+                continue
+            _flush_lines(commands, lines, negated=True)
+            commands.append(key[0])
+            commands.extend(negate(line) for line in compress_vlans(body))
+            commands.append('exit')
+        _flush_lines(commands, lines, negated=True)
+    return commands
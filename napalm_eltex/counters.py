@@ -0,0 +1,112 @@
+"""
+Interface counter deltas and rates between polls.
+"""
+import time
+from array import array
+
+COUNTER_FIELDS = (
+    'tx_error', 'rx_error', 'tx_discards', 'rx_discards', 'tx_octets', 'rx_octets',
+    'tx_unicast_packets', 'rx_unicast_packets', 'tx_multicast_packets', 'rx_multicast_packets',
+    'tx_broadcast_packets', 'rx_broadcast_packets'
+)
+# ошибки и потери в выводе CLI целые, остальные счётчики - строки
+INTEGER_COUNTERS = ('rx_discards', 'rx_error', 'tx_discards', 'tx_error')
+
+COUNTER32 = 2 ** 32
+COUNTER64 = 2 ** 64
+
+
+class CounterTracker(object):
+    """
+    Keep the previous get_interfaces_counters poll and turn the next one into deltas and rates.
+
+    The previous values of all interfaces live in one array of unsigned 64-bit
+    integers (one row of COUNTER_FIELDS per interface). A counter lower than
+    before is treated as a wrap: of 32 bits if the previous value fits into
+    32 bits (unless counter_bits=64), of 64 bits otherwise. A device reboot,
+    detected from uptime, re-baselines all interfaces instead.
+    """
+
+    def __init__(self, counter_bits=None, uptime_slack=10.0):
+        self.counter_bits = counter_bits
+        self.uptime_slack = uptime_slack
+        self._slots = {}
+        self._values = array('Q')
+        self._timestamp = None
+        self._uptime = None
+
+    def __len__(self):
+        return len(self._slots)
+
+    def reset(self):
+        """Forget the previous poll."""
+        self._slots = {}
+        self._values = array('Q')
+        self._timestamp = None
+        self._uptime = None
+
+    def _delta(self, previous, current):
+        if current >= previous:
+            return current - previous
+        if self.counter_bits == 32 or (self.counter_bits is None and previous < COUNTER32):
+            return current + COUNTER32 - previous
+        return current + COUNTER64 - previous
+
+    def _rebooted(self, uptime, interval):
+        if uptime is None or self._uptime is None or uptime < 0 or self._uptime < 0:
+            return False
+        # аптайм должен вырасти примерно на время между опросами
+        return uptime - self._uptime < interval - self.uptime_slack
+
+    def update(self, counters, uptime=None, timestamp=None):
+        """
+        Store a get_interfaces_counters result, return deltas and per-second rates against the previous one.
+
+        uptime is the device uptime in seconds (get_facts()['uptime']), timestamp
+        defaults to time.monotonic(). Interfaces seen for the first time, and all
+        interfaces after a reboot, have no deltas yet.
+
+        Sample output:
+        {
+            'interval': 300.0,
+            'reset': False,
+            'deltas': {'gi1/0/1': {'rx_octets': 1500000, ...}},
+            'rates': {'gi1/0/1': {'rx_octets': 5000.0, ...}}
+        }
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        interval = timestamp - self._timestamp if self._timestamp is not None else 0.0
+        reset = self._rebooted(uptime, interval)
+        baseline = self._timestamp is not None and not reset and interval > 0
+
+        width = len(COUNTER_FIELDS)
+        values = self._values
+        deltas = {}
+        rates = {}
+        for interface, data in counters.items():
+            current = [int(data.get(field) or 0) % COUNTER64 for field in COUNTER_FIELDS]
+            slot = self._slots.get(interface)
+            if slot is None:
+                slot = self._slots[interface] = len(values) // width
+                values.extend(current)
+                continue
+            offset = slot * width
+            if baseline:
+                delta = {
+                    field: self._delta(values[offset + index], current[index])
+                    for index, field in enumerate(COUNTER_FIELDS)
+                }
+                deltas[interface] = delta
+                rates[interface] = {field: value / interval for field, value in delta.items()}
+            values[offset:offset + width] = array('Q', current)
+
+        self._timestamp = timestamp
+        if uptime is not None:
+            self._uptime = uptime
+        return {
+            'interval': interval,
+            'reset': reset,
+            'deltas': deltas,
+            'rates': rates
+        }
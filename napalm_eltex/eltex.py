@@ -3,24 +3,51 @@ Napalm driver for Eltes switches.
 """
 from __future__ import unicode_literals
 import hashlib
+import os
 import re
 import socket
-from io import StringIO
+import sys
+import tempfile
+import threading
+import time
 
 import napalm.base.constants as c
-import pandas as pd
 # import NAPALM Base
 from napalm.base.base import NetworkDriver
 from napalm.base.exceptions import (
+    CommandTimeoutException,
+    CommitError,
     ConnectionException,
+    MergeConfigException,
+    ReplaceConfigException,
 )
 # import third party lib
 from netmiko import ConnectHandler
+import paramiko
+from scp import SCPClient
 # from netmiko.ssh_exception import NetMikoTimeoutException
 try:
     from netmiko.ssh_exception import NetMikoTimeoutException
 except ModuleNotFoundError:
     from netmiko import NetMikoTimeoutException
+try:
+    from netmiko.exceptions import ReadTimeout
+except ImportError:
+    ReadTimeout = NetMikoTimeoutException
+
+from napalm_eltex.arp import ArpTable
+from napalm_eltex.cache import CommandCache, FactsCache
+from napalm_eltex.columns import ArpColumns, CounterColumns, MacColumns
+from napalm_eltex.confdiff import diff_configs, merge_diff, push_commands
+from napalm_eltex.counters import CounterTracker
+from napalm_eltex.keepalive import Keepalive
+from napalm_eltex.pool import connect_with_backoff, default_pool, SessionPool
+from napalm_eltex.records import ArpEntry, InterfaceCounters, MacEntry
+from napalm_eltex.replay import ReplayDevice
+from napalm_eltex.snmp import SnmpBackend
+from napalm_eltex.stats import CommandStats, instrumented
+from napalm_eltex.timeouts import TimeoutHistory
+from napalm_eltex.tables import merge_wrapped_rows, read_delimited, read_fixed_width, table_body
 
 # from scp import SCPClient
 
@@ -30,6 +57,34 @@ DAY_SECONDS = 24 * HOUR_SECONDS
 WEEK_SECONDS = 7 * DAY_SECONDS
 YEAR_SECONDS = 365 * DAY_SECONDS
 
+RE_IPV4 = re.compile(r'(((25[0-5]|2[0-4][0-9]|[0-1]?[0-9][0-9]?)\.){3}(25[0-5]|2[0-4][0-9]|[0-1]?[0-9][0-9]?))')
+RE_MAC = re.compile(r'([0-9a-fA-F]{2}(([:\-]?)[0-9a-fA-F]{2}){5})')
+RE_MD5 = re.compile(r'\b[0-9a-fA-F]{32}\b')
+
+# "show interfaces", each pattern is applied only to lines holding its keyword
+RE_IF_NAME = re.compile(r'-+ show interfaces (?P<ifname>[a-zA-Z]+[0-9/]+).-+')
+RE_IF_MAC = re.compile(r'MAC address is (?P<ifmac>([0-9A-Fa-f]{2}[:-]){5}[0-9A-Fa-f]{2})')
+RE_IF_DESC = re.compile(r'Description: (?P<ifdesc>.*)')
+RE_IF_MTU = re.compile(r'Interface MTU is (?P<ifmtu>[0-9]*)')
+RE_IF_SPEED = re.compile(r'(Full|Half)-duplex, (?P<ifspeed>[0-9]+)Mbps')
+RE_IF_UPTIME = re.compile(r'Link is up for (?P<days>[0-9]+) days, (?P<hours>[0-9]+) hours, '
+                          r'(?P<minutes>[0-9]+) minutes and (?P<seconds>[0-9]+) seconds')
+RE_IF_IN_ERR = re.compile(r'(?P<in_err>[0-9]+) input errors')
+RE_IF_OUT_ERR = re.compile(r'(?P<out_err>[0-9]+) output errors')
+
+# команды, вывод которых разбирает каждый геттер
+GETTER_COMMANDS = {
+    'get_facts': ('show system', 'show system id', 'show version', 'show interfaces status', 'show vlan'),
+    'get_interfaces': ('show interfaces',),
+    'get_interfaces_ip': ('show ip interface',),
+    'get_interfaces_counters': ('show interfaces', 'show interfaces counters'),
+    'get_arp_table': ('show arp',),
+    'get_lldp_neighbors': ('show lldp neighbors',),
+    'get_mac_address_table': ('show mac address-table',),
+}
+
+INTERFACE_FIELDS = ('description', 'is_enabled', 'is_up', 'last_flapped', 'mac_address', 'speed', 'mtu')
+
 
 class CEDriver(NetworkDriver):
     """Napalm driver for Eltex switches."""
@@ -71,6 +126,8 @@ class CEDriver(NetworkDriver):
 
         self.transport = optional_args.get('transport', 'ssh')
         self.port = optional_args.get('port', 22)
+        # каталог с записанными выводами команд для transport='replay'
+        self.replay_dir = optional_args.get('replay_dir', '')
 
         self.changed = False
         self.loaded = False
@@ -78,42 +135,229 @@ class CEDriver(NetworkDriver):
         self.replace = False
         self.merge_candidate = ''
         self.replace_file = ''
+        # replace_file создан из config= и удаляется вместе с кандидатом
+        self.replace_tmp = False
         self.profile = ["ce"]
 
+        # кэш вывода show-команд в рамках одной сессии, по умолчанию выключен
+        self.cache = None
+        if optional_args.get('command_cache', False):
+            self.cache = CommandCache(
+                ttl=optional_args.get('command_cache_ttl', 30.0),
+                maxsize=optional_args.get('command_cache_size', 32)
+            )
+        # get_config копирует файлы конфигурации по SFTP или SCP вместо "show running-config"
+        self.config_transfer = optional_args.get('config_transfer', None)
+        self.config_files = {
+            'running': optional_args.get('config_running_file', 'running-config'),
+            'startup': optional_args.get('config_startup_file', 'startup-config')
+        }
+        # строк конфигурации за одну запись в канал при commit_config/rollback
+        self.config_chunk_size = optional_args.get('config_chunk_size', 50)
+        # сохранять конфигурацию в startup-config после commit_config
+        self.commit_save = optional_args.get('commit_save', False)
+        # команда, выводящая MD5 файла на устройстве, например 'show md5 {0}'
+        self.md5_command = optional_args.get('md5_command', None)
+        # статичные факты (серийный номер, версия, интерфейсы) на диске, до перезагрузки устройства
+        self.facts_cache = None
+        if optional_args.get('facts_cache_dir'):
+            self.facts_cache = FactsCache(
+                optional_args['facts_cache_dir'],
+                slack=optional_args.get('facts_cache_slack', 60.0)
+            )
+        # отправлять несколько команд в канал разом, не дожидаясь приглашения после каждой
+        self.pipeline = optional_args.get('pipeline', False)
+        # ошибки из полного "show interfaces" для get_interfaces_counters обновляются не чаще раза в
+        # counters_errors_ttl секунд, остальные опросы обходятся одной командой "show interfaces counters"
+        self.errors_cache = None
+        if optional_args.get('counters_errors_ttl', 0):
+            self.errors_cache = CommandCache(ttl=optional_args['counters_errors_ttl'], maxsize=8)
+        # счётчики и таблица MAC по SNMP вместо разбора вывода CLI, включается заданием community
+        self.snmp = None
+        if optional_args.get('snmp_community'):
+            self.snmp = SnmpBackend(
+                optional_args.get('snmp_host', hostname),
+                optional_args['snmp_community'],
+                port=optional_args.get('snmp_port', 161),
+                timeout=optional_args.get('snmp_timeout', 2.0),
+                retries=optional_args.get('snmp_retries', 1),
+                max_repetitions=optional_args.get('snmp_max_repetitions', 25)
+            )
+        # 'records' - таблицы MAC, ARP и счётчики компактными записями со __slots__ вместо словарей,
+        # 'columns' - таблицами из типизированных колонок (napalm_eltex.columns)
+        self.result_format = optional_args.get('result_format', 'dict')
+        # время и объём вывода каждой команды и геттера, по умолчанию выключено
+        self.stats = None
+        if optional_args.get('stats', False) or optional_args.get('stats_callback'):
+            self.stats = CommandStats(
+                hostname,
+                callbacks=[optional_args['stats_callback']] if optional_args.get('stats_callback') else None
+            )
+        # таймауты чтения команд по истории их задержек, история хранится в timeouts_dir
+        self.timeouts = None
+        if optional_args.get('adaptive_timeouts', False) or optional_args.get('timeouts_dir'):
+            self.timeouts = TimeoutHistory(
+                hostname,
+                directory=optional_args.get('timeouts_dir'),
+                factor=optional_args.get('timeout_factor', 4.0),
+                minimum=optional_args.get('timeout_min', 5.0),
+                maximum=optional_args.get('timeout_max', 300.0)
+            )
+        # приглашение устройства для expect_string, определяется один раз за сессию
+        self.prompt_pattern = None
+        # 'transport' - is_alive проверяет состояние SSH без обращения к CLI
+        self.alive_check = optional_args.get('alive_check', 'cli')
+        # фоновый keepalive простаивающей сессии, keepalive_mode 'ssh' или 'cli'
+        self.keepalive_interval = optional_args.get('keepalive_interval', 0)
+        self.keepalive_mode = optional_args.get('keepalive_mode', 'ssh')
+        if self.keepalive_interval and 'keepalive' not in optional_args:
+            # поток заменяет keepalive транспорта paramiko, второй источник тех же запросов не нужен
+            self.netmiko_optional_args['keepalive'] = 0
+        self.keepalive = None
+        # сессии берутся из пула и возвращаются в него при close(), True - общий napalm_eltex.pool.default_pool
+        session_pool = optional_args.get('session_pool')
+        self.pool = default_pool if session_pool is True else session_pool
+        if not isinstance(self.pool, SessionPool):
+            self.pool = None
+        # при обрыве сессии переподключаться с экспоненциальной паузой и повторять show-команду один раз
+        self.reconnect = optional_args.get('reconnect', self.pool is not None)
+        self.reconnect_attempts = optional_args.get('reconnect_attempts', 3)
+        self.reconnect_backoff = optional_args.get('reconnect_backoff', 1.0)
+        # канал занимает одна команда за раз (команды драйвера или keepalive)
+        self.channel_lock = threading.RLock()
+        self.last_activity = time.monotonic()
+        # последний снимок ARP для get_arp_entry
+        self.arp_snapshot = None
+        # предыдущий опрос счётчиков для get_interfaces_counters_rates
+        self.counter_tracker = CounterTracker(
+            counter_bits=optional_args.get('counter_bits'),
+            uptime_slack=optional_args.get('counter_uptime_slack', 10.0)
+        )
+
     def open(self):
         """Open a connection to the device."""
+        if self.transport == 'replay':
+            if not os.path.isdir(self.replay_dir):
+                raise ConnectionException('Replay directory {} does not exist'.format(self.replay_dir))
+            self.device = ReplayDevice(directory=self.replay_dir)
+            return
+
+        if self.pool is not None and self.transport == 'ssh':
+            self.device = self.pool.acquire(
+                self._pool_key(), self._connect,
+                attempts=self.reconnect_attempts, backoff=self.reconnect_backoff
+            )
+        else:
+            self.device = self._connect()
+
+        self.last_activity = time.monotonic()
+        if self.keepalive_interval:
+            self.keepalive = Keepalive(self, interval=self.keepalive_interval, mode=self.keepalive_mode)
+            self.keepalive.start()
+
+    def _connect(self):
+        """Open a new SSH session."""
         try:
             if self.transport == 'ssh':
                 device_type = 'eltex'
             else:
                 raise ConnectionException("Unknown transport: {}".format(self.transport))
 
-            self.device = ConnectHandler(device_type=device_type,
-                                         host=self.hostname,
-                                         username=self.username,
-                                         password=self.password,
-                                         **self.netmiko_optional_args)
+            return ConnectHandler(device_type=device_type,
+                                  host=self.hostname,
+                                  username=self.username,
+                                  password=self.password,
+                                  **self.netmiko_optional_args)
             # self.device.enable()
 
         except NetMikoTimeoutException:
             raise ConnectionException('Cannot connect to {}'.format(self.hostname))
 
+    def _pool_key(self):
+        return SessionPool.key(self.hostname, self.port, self.username, self.password)
+
+    def _reconnect(self):
+        """Replace a dropped session with a new one, connecting with exponential backoff."""
+        with self.channel_lock:
+            if self.pool is not None:
+                self.pool.discard(self.device)
+            else:
+                try:
+                    self.device.disconnect()
+                except Exception:
+                    pass
+            self.device = None
+            self.prompt_pattern = None
+            self.device = connect_with_backoff(
+                self._connect, attempts=self.reconnect_attempts, backoff=self.reconnect_backoff
+            )
+            self.last_activity = time.monotonic()
+        # keepalive останавливается на первой ошибке, для новой сессии запускаем его заново
+        if self.keepalive is not None and self.keepalive.failed:
+            self.keepalive.stop()
+            self.keepalive = Keepalive(self, interval=self.keepalive_interval, mode=self.keepalive_mode)
+            self.keepalive.start()
+
+    def _recover(self, err):
+        """
+        Reconnect if a command failed because the session dropped.
+
+        Return True if the command can be sent again. A timeout counts as a dropped
+        session only when the SSH transport or channel is closed.
+        """
+        if not self.reconnect or self.transport != 'ssh' or self.device is None:
+            return False
+        if isinstance(err, (ReadTimeout, CommandTimeoutException)):
+            if self._transport_alive():
+                return False
+        elif not isinstance(err, (socket.error, EOFError, paramiko.SSHException)):
+            return False
+        self._reconnect()
+        return True
+
     def close(self):
         """Close the connection to the device."""
-        if self.changed and self.backup_file != "":
+        # копия running-config не нужна и после rollback(), удаляем её в любом случае
+        if self.backup_file:
             self._delete_file(self.backup_file)
-        self.device.disconnect()
+            self.backup_file = ''
+        if self.keepalive is not None:
+            self.keepalive.stop()
+            self.keepalive = None
+        # в пул попадают только SSH-сессии, ReplayDevice закрываем как обычно
+        if self.pool is not None and self.transport == 'ssh':
+            self.pool.release(self._pool_key(), self.device)
+        else:
+            self.device.disconnect()
         self.device = None
+        self.prompt_pattern = None
+        self.invalidate_cache()
+        if self.timeouts is not None:
+            self.timeouts.save()
+        if self.snmp is not None:
+            self.snmp.close()
 
     def is_alive(self):
-        """Return a flag with the state of the SSH connection."""
+        """
+        Return a flag with the state of the SSH connection.
+
+        By default a new line is sent to the CLI. With alive_check='transport' only the
+        state of the SSH transport and channel is checked and a keepalive global request
+        (no reply expected) is written, without a round trip to the CLI.
+        """
         null = chr(0)
+        if self.keepalive is not None and self.keepalive.failed:
+            return {'is_alive': False}
+        if self.alive_check == 'transport':
+            return {'is_alive': self._transport_alive()}
         try:
             if self.device is None:
                 return {'is_alive': False}
             else:
                 # для проверки активности соединения отправляем перевод строки
-                self.device.send_command('\n')
+                with self.channel_lock:
+                    self.device.send_command('\n')
+                    self.last_activity = time.monotonic()
         except (socket.error, EOFError):
             # If unable to send, we can tell for sure that the connection is unusable,
             # hence return False.
@@ -122,46 +366,374 @@ class CEDriver(NetworkDriver):
             'is_alive': self.device.remote_conn.transport.is_active()
         }
 
-    def compare_config(self):
-        """
-        Compare candidate config with running.
-        ! Not implemented
+    def _transport_alive(self):
+        """Return True if the SSH transport and the shell channel are open."""
+        if self.device is None:
+            return False
+        channel = getattr(self.device, 'remote_conn', None)
+        if channel is None:
+            # соединение без SSH (ReplayDevice)
+            return True
+        transport = channel.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        if channel.closed or channel.eof_received or channel.exit_status_ready():
+            return False
+        try:
+            # запись в сокет вскрывает разорванное соединение, ответа запрос не требует;
+            # send_ignore() paramiko шлёт пакет без длины данных, строгие серверы рвут на нём соединение
+            transport.global_request('keepalive@lag.net', wait=False)
+        except (socket.error, EOFError, paramiko.SSHException):
+            return False
+        return True
+
+    def invalidate_cache(self, command=None):
+        """Drop cached output of one command, or of all commands if command is None."""
+        if self.cache is not None:
+            self.cache.invalidate(command)
+        if self.errors_cache is not None and command is None:
+            self.errors_cache.invalidate()
+
+    def get_stats(self):
         """
+        Return command and getter timings recorded since the driver was created or reset_stats() ('stats' optional argument).
 
-        return ''
+        Sample output:
+        {
+            'device': '10.0.0.1',
+            'commands': {
+                'show arp': {'calls': 2, 'cache_hits': 0, 'seconds': 0.62, 'max_seconds': 0.33,
+                             'bytes': 40960, 'lines': 520}
+            },
+            'getters': {
+                'get_arp_table': {'calls': 2, 'errors': 0, 'seconds': 0.7, 'transport_seconds': 0.62,
+                                  'parse_seconds': 0.08}
+            }
+        }
+        """
+        if self.stats is None:
+            return {'device': self.hostname, 'commands': {}, 'getters': {}}
+        return self.stats.snapshot()
+
+    def reset_stats(self):
+        """Drop recorded timings."""
+        if self.stats is not None:
+            self.stats.reset()
+
+    def _device_send_command(self, command, **kwargs):
+        """
+        Run send_command on the connection, recording its time if stats are enabled.
+
+        With adaptive timeouts read_timeout comes from the latency history of the
+        command, a read_timeout passed in is used until the command has history.
+        A command that timed out is sent once more with the backed-off timeout.
+        """
+        if self.stats is None and self.timeouts is None:
+            with self.channel_lock:
+                output = self.device.send_command(command, **kwargs)
+                self.last_activity = time.monotonic()
+            return output
+        if self.timeouts is not None:
+            read_timeout = self.timeouts.timeout(command, default=kwargs.get('read_timeout'))
+            if read_timeout is not None:
+                kwargs['read_timeout'] = read_timeout
+        for attempt in range(2):
+            started = time.monotonic()
+            try:
+                with self.channel_lock:
+                    if attempt and hasattr(self.device, 'read_until_prompt'):
+                        # дочитываем вывод первой попытки, иначе он попадет в ответ повтора
+                        self.device.read_until_prompt(read_timeout=kwargs['read_timeout'])
+                    output = self.device.send_command(command, **kwargs)
+                    self.last_activity = time.monotonic()
+                break
+            except ReadTimeout:
+                if self.timeouts is None:
+                    raise
+                self.timeouts.backoff(command, kwargs.get('read_timeout', 10.0))
+                if attempt:
+                    raise
+                kwargs['read_timeout'] = self.timeouts.timeout(command)
+        seconds = time.monotonic() - started
+        if self.stats is not None:
+            self.stats.record_command(command, seconds, output)
+        if self.timeouts is not None:
+            self.timeouts.observe(command, seconds)
+        return output
+
+    def _expect_kwargs(self):
+        """
+        Return send_command arguments waiting for the prompt found once per session.
+
+        Without them netmiko looks the prompt up again (one more round trip) before
+        every command. Used with adaptive timeouts, for show commands only.
+        """
+        if self.timeouts is None or not hasattr(self.device, 'find_prompt'):
+            return {}
+        if self.prompt_pattern is None:
+            self.prompt_pattern = re.escape(self.device.find_prompt().strip())
+        return {'expect_string': self.prompt_pattern}
+
+    def _cache_get(self, command):
+        """Return the cached output of a command or None."""
+        output = self.cache.get(command) if self.cache is not None else None
+        if output is not None and self.stats is not None:
+            self.stats.record_command(command, 0.0, output, cached=True)
+        return output
+
+    def _send_command(self, command, **kwargs):
+        """Send a show command to the device, going through the session cache if enabled."""
+        output = self._cache_get(command)
+        if output is None:
+            try:
+                output = self._device_send_command(command, **dict(kwargs, **self._expect_kwargs()))
+            except Exception as err:
+                # show-команды безопасно повторить на новой сессии
+                if not self._recover(err):
+                    raise
+                output = self._device_send_command(command, **dict(kwargs, **self._expect_kwargs()))
+            if self.cache is not None:
+                self.cache.set(command, output)
+        return output
 
-    def discard_config(self):
+    def _send_commands(self, commands):
         """
-        Discard changes.
-        ! Not implemented
+        Send several show commands, return a dict of their outputs.
+
+        Commands are pipelined when the 'pipeline' optional argument is set,
+        outputs are taken from and stored to the session cache if it is enabled.
         """
-        pass
+        outputs = {}
+        pending = []
+        for command in commands:
+            output = self._cache_get(command)
+            if output is None:
+                pending.append(command)
+            else:
+                outputs[command] = output
 
+        if self.pipeline and len(pending) > 1 and hasattr(self.device, 'write_channel'):
+            try:
+                results = self._send_pipelined(pending)
+            except Exception as err:
+                if not self._recover(err):
+                    raise
+                results = self._send_pipelined(pending)
+            for command, output in zip(pending, results):
+                outputs[command] = output
+                if self.cache is not None:
+                    self.cache.set(command, output)
+        else:
+            for command in pending:
+                outputs[command] = self._send_command(command)
+        return outputs
+
+    def _send_pipelined(self, commands, read_timeout=None):
+        """
+        Write all commands onto the channel back to back and split the output by prompts.
+
+        Return the list of outputs in the order of commands. read_timeout is the
+        longest pause in the output (default: driver timeout).
+        """
+        if read_timeout is None:
+            read_timeout = self.timeout
+        with self.channel_lock:
+            started = time.monotonic()
+            device = self.device
+            device.clear_buffer()
+            device.write_channel(''.join(command + device.RETURN for command in commands))
+
+            # приглашение в начале строки; после него устройство печатает эхо следующей команды
+            re_prompt = re.compile(r'^' + re.escape(device.base_prompt) + r'[^\r\n#>]*[#>]', flags=re.M)
+            chunks = []
+            prompts = 0
+            tail = ''
+            deadline = time.monotonic() + read_timeout
+            while prompts < len(commands):
+                chunk = device.read_channel()
+                if chunk:
+                    chunks.append(chunk)
+                    # приглашения считаем по целым строкам, недочитанную строку проверяем отдельно
+                    lines = (tail + chunk).split('\n')
+                    tail = lines.pop()
+                    prompts += len(re_prompt.findall('\n'.join(lines)))
+                    deadline = time.monotonic() + read_timeout
+                elif time.monotonic() > deadline:
+                    raise CommandTimeoutException('Timeout reading pipelined commands from {0}'.format(self.hostname))
+                else:
+                    time.sleep(0.01)
+                if prompts == len(commands) - 1 and re_prompt.match(tail.strip()):
+                    break
+            self.last_activity = time.monotonic()
+
+        outputs = []
+        sections = re_prompt.split(''.join(chunks).replace('\r\n', '\n').replace('\r', ''))
+        for command, section in zip(commands, sections):
+            lines = section.split('\n')
+            # первая строка секции - эхо команды
+            if lines and command in lines[0]:
+                lines.pop(0)
+            outputs.append('\n'.join(lines).strip('\n'))
+        if self.stats is not None:
+            self.stats.record_batch(commands, time.monotonic() - started, outputs)
+        return outputs
+
+    def _iter_command_lines(self, command, read_timeout=None):
+        """
+        Send a command and yield its output line by line as it arrives from the channel.
+
+        read_timeout is the longest pause in the output (default: driver timeout).
+        Output already in the session cache is served from there.
+        """
+        output = self._cache_get(command)
+        if output is not None:
+            for line in output.splitlines():
+                yield line
+            return
+
+        device = self.device
+        if not hasattr(device, 'write_channel'):
+            # соединение без канала (например, ReplayDevice) отдает вывод целиком
+            for line in self._device_send_command(command).splitlines():
+                yield line
+            return
+
+        if read_timeout is None:
+            read_timeout = self.timeout
+            if self.timeouts is not None:
+                read_timeout = self.timeouts.timeout(command, default=read_timeout)
+        # время канала без времени разбора строк вызывающим, размер и число строк вывода
+        mark = time.monotonic()
+        transport = 0.0
+        size = 0
+        count = 0
+        for attempt in range(2):
+            self.channel_lock.acquire()
+            try:
+                device.clear_buffer()
+                device.write_channel(command + device.RETURN)
+                break
+            except Exception as err:
+                self.channel_lock.release()
+                # повторяем, только пока не отдано ни одной строки вывода
+                if attempt or not self._recover(err):
+                    raise
+                device = self.device
+
+        finished = False
+        echo = True
+        tail = ''
+        deadline = time.monotonic() + read_timeout
+        try:
+            while True:
+                chunk = device.read_channel()
+                if chunk:
+                    size += len(chunk)
+                    # в буфере держим только недочитанную последнюю строку
+                    lines = (tail + chunk).split('\n')
+                    tail = lines.pop()
+                    count += len(lines)
+                    transport += time.monotonic() - mark
+                    for line in lines:
+                        line = line.rstrip('\r')
+                        if echo and command in line:
+                            # эхо самой команды
+                            echo = False
+                            continue
+                        yield line
+                    mark = time.monotonic()
+                    deadline = mark + read_timeout
+                # вывод закончился, когда в последней строке появилось приглашение
+                prompt = tail.strip()
+                if prompt.startswith(device.base_prompt) and prompt.endswith(('#', '>')):
+                    finished = True
+                    if self.timeouts is not None:
+                        self.timeouts.observe(command, transport + time.monotonic() - mark)
+                    return
+                if time.monotonic() > deadline:
+                    finished = True
+                    if self.timeouts is not None:
+                        self.timeouts.backoff(command, read_timeout)
+                    raise CommandTimeoutException('Timeout reading "{0}" from {1}'.format(command, self.hostname))
+                if not chunk:
+                    time.sleep(0.01)
+        finally:
+            try:
+                if finished:
+                    transport += time.monotonic() - mark
+                else:
+                    # генератор закрыли раньше времени, дочитываем вывод до приглашения, если оно ещё не пришло
+                    mark = time.monotonic()
+                    prompt = tail.strip()
+                    if not (prompt.startswith(device.base_prompt) and prompt.endswith(('#', '>'))):
+                        device.read_until_prompt()
+                    transport += time.monotonic() - mark
+            finally:
+                self.last_activity = time.monotonic()
+                self.channel_lock.release()
+            if self.stats is not None:
+                self.stats.record_command(command, transport, size=size, lines=count)
+
+    def compare_config(self):
+        """Compare candidate config with running."""
+        if not self.loaded:
+            return ''
+        if self.replace:
+            return self._get_diff(self.replace_file)
+        return self._get_merge_diff()
+
+    def discard_config(self):
+        """Discard the loaded candidate."""
+        if self.replace_tmp:
+            self._delete_file(self.replace_file)
+        self.loaded = False
+        self.replace = False
+        self.merge_candidate = ''
+        self.replace_file = ''
+        self.replace_tmp = False
+
+    @instrumented
     def get_facts(self):
-        """Return a set of facts from the devices."""
+        """
+        Return a set of facts from the devices.
+
+        With the 'facts_cache_dir' optional argument facts are stored on disk per device,
+        later calls send only "show system" and take the rest from the stored copy
+        unless the uptime shows the device has rebooted since.
+        """
         # default values.
         vendor = u'Eltex'
         uptime = -1
         interface_list = []
         serial_number, fqdn, os_version, hostname, model = (u'Unknown', u'Unknown', u'Unknown', u'Unknown', u'Unknown')
 
+        outputs = {}
+        if self.facts_cache is not None:
+            outputs['show system'] = self._send_command('show system')
+            try:
+                system = self._parse_show_system(outputs['show system'])
+            except Exception as err:
+                raise Exception('Error execute "show system". {0}'.format(err))
+            facts = self.facts_cache.get(self.hostname, system['uptime'])
+            if facts is not None:
+                facts.update({
+                    'uptime': int(system['uptime']),
+                    'model': str(system['model']),
+                    'hostname': str(system['hostname'])
+                })
+                return facts
+        outputs.update(self._send_commands([
+            command for command in GETTER_COMMANDS['get_facts'] if command not in outputs
+        ]))
+
         try:
-            show_system = self.device.send_command('show system')
-            for line in show_system.splitlines():
-                if 'System Description:' in line:
-                    _, model = line.split('System Description:')
-                    model = model.strip()
-                if 'System Up Time (days,hour:min:sec):' in line:
-                    _, uptime = line.split('System Up Time (days,hour:min:sec):')
-                    uptime = self._parse_eltex_uptime(uptime.strip())
-                if 'System Name:' in line:
-                    _, hostname = line.split('System Name:')
-                    hostname = hostname.strip()
+            system = self._parse_show_system(outputs['show system'])
+            model, uptime, hostname = system['model'], system['uptime'], system['hostname']
         except Exception as err:
             raise Exception('Error execute "show system". {0}'.format(err))
 
         try:
-            show_serial = self.device.send_command('show system id')
+            show_serial = outputs['show system id']
             _active_image = False
             row = 0
             for line in show_serial.splitlines():
@@ -176,7 +748,7 @@ class CEDriver(NetworkDriver):
             raise Exception('Error execute "show system id". {0}'.format(err))
 
         try:
-            show_ver = self.device.send_command('show version')
+            show_ver = outputs['show version']
             _active_image = False
             for line in show_ver.splitlines():
                 if 'Active-image' in line:
@@ -189,7 +761,7 @@ class CEDriver(NetworkDriver):
             raise Exception('Error execute "show version". {0}'.format(err))
 
         try:
-            show_interface = self.device.send_command('show interfaces status')
+            show_interface = outputs['show interfaces status']
             _head_end = False
             for line in show_interface.splitlines():
                 if '-------' in line:
@@ -203,7 +775,7 @@ class CEDriver(NetworkDriver):
             raise Exception('Error execute "show interface status". {0}'.format(err))
 
         try:
-            show_vlan = self.device.send_command('show vlan')
+            show_vlan = outputs['show vlan']
             _head_end = False
             for line in show_vlan.splitlines():
                 if '----' in line:
@@ -216,7 +788,7 @@ class CEDriver(NetworkDriver):
         except Exception as err:
             raise Exception('Error execute "show vlan". {0}'.format(err))
 
-        return {
+        facts = {
             'uptime': int(uptime),
             'vendor': vendor,
             'os_version': str(os_version),
@@ -226,44 +798,111 @@ class CEDriver(NetworkDriver):
             'fqdn': fqdn,  # ? fqdn(fully qualified domain name)
             'interface_list': interface_list
         }
+        if self.facts_cache is not None:
+            self.facts_cache.set(self.hostname, facts)
+        return facts
 
-    def cli(self, commands):
-        """Execute raw CLI commands and returns their output."""
+    @instrumented
+    def cli(self, commands, pipeline=None):
+        """
+        Execute raw CLI commands and returns their output.
+
+        With pipeline=True (default: the 'pipeline' optional argument) all commands
+        are written to the device at once and the combined output is split by prompts.
+        """
         cli_output = {}
         if type(commands) is not list:
             raise TypeError('Please enter a valid list of commands!')
 
-        for command in commands:
-            output = self.device.send_command(command)
-            cli_output[str(command)] = output
+        if pipeline is None:
+            pipeline = self.pipeline
+        if pipeline and hasattr(self.device, 'write_channel'):
+            outputs = self._send_pipelined(commands)
+            for command, output in zip(commands, outputs):
+                cli_output[str(command)] = output
+        else:
+            for command in commands:
+                output = self._device_send_command(command)
+                cli_output[str(command)] = output
+        # произвольные команды могут менять состояние устройства (и приглашение), кэш больше не актуален
+        self.invalidate_cache()
+        self.prompt_pattern = None
         return cli_output
 
+    @instrumented
     def commit_config(self, **kwargs):
         """
         Commit configuration.
-        ! Not implemented
+
+        The running config is saved for rollback(), the commands turning it into the
+        candidate are sent in chunks of 'config_chunk_size' lines, then the running
+        config is read once more and compared with the candidate.
         :param **kwargs:
         """
-        pass
+        if not self.loaded:
+            return
+        if self.replace:
+            with open(self.replace_file, 'r', encoding='utf-8') as fs:
+                candidate = fs.read()
+        else:
+            candidate = self.merge_candidate
+
+        if self.backup_file:
+            self._delete_file(self.backup_file)
+        self.backup_file = self._save_config()
+        with open(self.backup_file, 'r', encoding='utf-8') as fs:
+            running_config = fs.read()
+
+        commands = push_commands(running_config, candidate, replace=self.replace)
+        self.changed = True
+        self._commit_merge(commands)
+
+        # одно сравнение по хэшам секций вместо проверки каждой команды
+        self.invalidate_cache()
+        running_config = self.get_config(retrieve='running')['running']
+        left = push_commands(running_config, candidate, replace=self.replace)
+        if left:
+            raise CommitError('Candidate is not applied, {0} commands differ: {1}'.format(
+                len(left), '; '.join(left[:10])))
+        if self.commit_save:
+            self._save_startup()
+        self.discard_config()
 
     def load_merge_candidate(self, filename=None, config=None):
-        """
-        Open the candidate config and merge.
-        ! Not implemented
-        """
-        pass
+        """Open the candidate config and merge."""
+        if not filename and not config:
+            raise MergeConfigException('filename or config param must be provided.')
+        if filename:
+            try:
+                with open(filename, 'r', encoding='utf-8') as fs:
+                    config = fs.read()
+            except IOError as err:
+                raise MergeConfigException('Error read {0}. {1}'.format(filename, err))
+        self.discard_config()
+        self.merge_candidate = config
+        self.replace = False
+        self.loaded = True
 
     def load_replace_candidate(self, filename=None, config=None):
-        """
-        Open the candidate config and replace.
-        ! Not implemented
-        """
-        pass
-
-    def get_interfaces(self):
+        """Open the candidate config and replace."""
+        if not filename and not config:
+            raise ReplaceConfigException('filename or config param must be provided.')
+        if filename and not os.path.isfile(filename):
+            raise ReplaceConfigException('File {0} does not exist'.format(filename))
+        self.discard_config()
+        self.replace_file = filename or self._create_tmp_file(config)
+        self.replace_tmp = not filename
+        self.replace = True
+        self.loaded = True
+
+    @instrumented
+    def get_interfaces(self, interfaces=None):
         """
         Get interface details (last_flapped is not implemented).
 
+        With interfaces=['gi1/0/49', 'te1/0/1'] only those ports are queried
+        ("show interfaces <port>" per port) instead of the whole "show interfaces".
+
         Sample Output:
         {
             "Vlanif3000": {
@@ -286,87 +925,32 @@ class CEDriver(NetworkDriver):
             }
         }
         """
-        interfaces = {}
-        show_interfaces = self.device.send_command('show interfaces', read_timeout=60.0)
+        result = {}
+        show_interfaces = self._show_interfaces(interfaces)
         if not show_interfaces:
             return {}
-        # вывод собирается в список текстовых блоков по каждому интерфейсу
-        interfaces_data = []
-        _temp = ''
-        for line in (show_interfaces + '\n\r--------------').splitlines():
-            if '--------------' in line:
-                if _temp != '':
-                    interfaces_data.append(_temp)
-                _temp = line + '\n'
-            else:
-                _temp += line + '\n'
-
-        re_ifname = '(-+)( show interfaces )(?P<ifname>[a-zA-Z]+[0-9/]+)(.)(-+)'
-        re_ifmac = '(MAC address is )(?P<ifmac>([0-9A-Fa-f]{2}[:-]){5}([0-9A-fa-f]{2}))'
-        re_ifup = '(?P<ifup>is up )'
-        re_ifdesc = '(Description: )(?P<ifdesc>.*)'
-        re_ifmtu = '(Interface MTU is )(?P<ifmtu>[0-9]*)'
-        re_ifspeed = '((Full|Half)-duplex, )((?P<ifspeed>[0-9]+)(Mbps))'
-        re_ifuptime = '(Link is up for )((?P<days>[0-9]+) days, )((?P<hours>[0-9]+) hours, )((?P<minutes>[0-9]+) minutes and )((?P<seconds>[0-9]+) seconds)'
-
         try:
-            for data in interfaces_data:
-                interface_name = ''
-                interface_is_enabled = False
-                interface_description = ''
-                interface_last_flapped = -1
-                interface_is_up = False
-                interface_mac_address = ''
-                interface_speed = 0
-                interface_mtu = 0
-
-                match_ifname = re.search(re_ifname, data, flags=re.M)
-                if match_ifname:
-                    interface_name = match_ifname.group('ifname')
-
-                match_ifmac = re.search(re_ifmac, data, flags=re.M)
-                if match_ifmac:
-                    interface_mac_address = match_ifmac.group('ifmac')
-
-                match_ifup = re.search(re_ifup, data, flags=re.M)
-                if match_ifup:
-                    interface_is_up = True
-                    interface_is_enabled = True
-
-                match_ifdesc = re.search(re_ifdesc, data, flags=re.M)
-                if match_ifdesc:
-                    interface_description = match_ifdesc.group('ifdesc')
-
-                match_ifmtu = re.search(re_ifmtu, data, flags=re.M)
-                if match_ifmtu:
-                    interface_mtu = int(match_ifmtu.group('ifmtu'))
-
-                match_ifspeed = re.search(re_ifspeed, data, flags=re.M)
-                if match_ifspeed:
-                    interface_speed = int(match_ifspeed.group('ifspeed'))
-
-                match_ifuptime = re.search(re_ifuptime, data, flags=re.M)
-                if match_ifuptime:
-                    interface_last_flapped = int(match_ifuptime.group('days')) * 24 * 60 * 60 + int(
-                        match_ifuptime.group('hours')) * 60 * 60 + int(match_ifuptime.group('minutes')) * 60 + int(
-                        match_ifuptime.group('seconds'))
-
-                interfaces.update({
-                    interface_name: {
-                        'description': interface_description,
-                        'is_enabled': interface_is_enabled,
-                        'is_up': interface_is_up,
-                        'last_flapped': interface_last_flapped,
-                        'mac_address': interface_mac_address,
-                        'speed': interface_speed,
-                        'mtu': interface_mtu
-                    }
-                })
+            for interface_name, record in self._parse_show_interfaces(show_interfaces).items():
+                result[interface_name] = {field: record[field] for field in INTERFACE_FIELDS}
         except Exception as err:
             raise Exception('Error parse interface data. {0}'.format(err))
 
-        return interfaces
+        return result
+
+    def _show_interfaces(self, interfaces=None, counters=False):
+        """
+        Return "show interfaces [counters]" output, of the given ports only if interfaces is set.
+
+        Outputs of per-port commands are concatenated, the parsers read them as one table.
+        """
+        command = 'show interfaces counters' if counters else 'show interfaces'
+        if interfaces is None:
+            return self._send_command(command, read_timeout=60.0)
+        commands = ['{0} {1}'.format(command, interface) for interface in interfaces]
+        outputs = self._send_commands(commands)
+        return '\n\n'.join(outputs[command] for command in commands if outputs[command])
 
+    @instrumented
     def get_interfaces_ip(self):
         """
         Get interface IP details. Returns a dictionary of dictionaries.
@@ -401,7 +985,7 @@ class CEDriver(NetworkDriver):
         }
         """
         interfaces_ip = {}
-        show_v4 = self.device.send_command('show ip interface')
+        show_v4 = self._send_command('show ip interface')
         # show_v6 = self.device.send_command('show ipv6 interface')
 
         if not show_v4:
@@ -431,143 +1015,142 @@ class CEDriver(NetworkDriver):
 
         return interfaces
 
-    def get_interfaces_counters(self):
-        """Return interfaces counters."""
-        interfaces = {}
-
-        show_interfaces = self.device.send_command('show interfaces')
-        if not show_interfaces:
-            return {}
-
-        # вывод собирается в список текстовых блоков по каждому интерфейсу
-        data_block = []
-        _temp = ''
-        for line in (show_interfaces + '\n\r--------------').splitlines():
-            if '--------------' in line:
-                if _temp != '':
-                    data_block.append(_temp)
-                _temp = line + '\n'
-            else:
-                _temp += line + '\n'
-
-
-
-        re_ifname = '(-+)( show interfaces )(?P<ifname>[a-zA-Z]+[0-9/]+)(.)(-+)'
-        re_inerr = '(?P<in_err>\d+)( input errors)'
-        re_outerr = '(?P<out_err>\d+)( output errors)'
+    @instrumented
+    def get_interfaces_counters(self, interfaces=None):
+        """
+        Return interfaces counters.
+
+        With interfaces=['gi1/0/49', 'te1/0/1'] only those ports are queried. With the
+        'counters_errors_ttl' optional argument rx_error/tx_error are refreshed from
+        "show interfaces" at most once per that many seconds. With 'snmp_community'
+        the counters are read over SNMP (IF-MIB) instead.
+        """
+        if self.snmp is not None:
+            result = self.snmp.get_interfaces_counters(interfaces)
+            if self.result_format == 'records':
+                result = {name: InterfaceCounters(**counters) for name, counters in result.items()}
+            elif self.result_format == 'columns':
+                table = CounterColumns(self.hostname)
+                for name, counters in result.items():
+                    table.add(name, **counters)
+                result = table
+            return result
+
+        result = CounterColumns(self.hostname) if self.result_format == 'columns' else {}
+
+        errors = self._get_interface_errors(interfaces)
+        if not errors:
+            return result if self.result_format == 'columns' else {}
+
+        for interface_name, (rx_error, tx_error) in errors.items():
+            if self.result_format == 'columns':
+                result.add(interface_name, tx_error=tx_error, rx_error=rx_error)
+                continue
+            if self.result_format == 'records':
+                result[interface_name] = InterfaceCounters(tx_error=tx_error, rx_error=rx_error)
+                continue
+            result[interface_name] = {
+                'tx_error': tx_error,
+                'rx_error': rx_error,
+                'tx_discards': 0,
+                'rx_discards': 0,
+                'tx_octets': 0,
+                'rx_octets': 0,
+                'tx_unicast_packets': 0,
+                'rx_unicast_packets': 0,
+                'tx_multicast_packets': 0,
+                'rx_multicast_packets': 0,
+                'tx_broadcast_packets': 0,
+                'rx_broadcast_packets': 0
+            }
 
+        # данные выдаются в несколько таблиц, первая с rx, вторая с tx
+        show_counters = self._show_interfaces(interfaces, counters=True)
+        if not show_counters:
+            return CounterColumns(self.hostname) if self.result_format == 'columns' else {}
 
         try:
-            for data in data_block:
-                interface_name = ''
-                interface_in_error = 0
-                interface_out_error = 0
-
-                match_ifname = re.search(re_ifname, data, flags=re.M)
-                if match_ifname:
-                    interface_name = match_ifname.group('ifname')
-
-                match_ifinerr = re.search(re_inerr, data, flags=re.M)
-                if match_ifinerr:
-                    interface_in_error = match_ifinerr.group('in_err')
-
-                match_ifouterr = re.search(re_outerr, data, flags=re.M)
-                if match_ifouterr:
-                    interface_out_error = match_ifouterr.group('out_err')
-
-                interfaces.update({
-                    interface_name: {
-                        'tx_error': int(interface_out_error),
-                        'rx_error': int(interface_in_error),
-                        'tx_discards': 0,
-                        'rx_discards': 0,
-                        'tx_octets': 0,
-                        'rx_octets': 0,
-                        'tx_unicast_packets': 0,
-                        'rx_unicast_packets': 0,
-                        'tx_multicast_packets': 0,
-                        'rx_multicast_packets': 0,
-                        'tx_broadcast_packets': 0,
-                        'rx_broadcast_packets': 0
-
-                    }
-                })
+            # режем вывод на строки и собираем блоки из таблиц, таблица заканчивается пустой строкой
+            tables = []
+            data_block = None
+            for line in show_counters.splitlines():
+                if not line.strip():
+                    if data_block is not None:
+                        tables.append(data_block)
+                    data_block = None
+                elif '-------' in line:
+                    data_block = []
+                elif data_block is not None:
+                    data_block.append(line)
+            if data_block is not None:
+                tables.append(data_block)
+
+            for index, data_block in enumerate(tables):
+                direction = 'rx' if index % 2 == 0 else 'tx'
+                # если данные не вошли в строку, то они продолжаются на следующей, склеиваем их
+                for row in merge_wrapped_rows(read_fixed_width(data_block)):
+                    counters = result[row[0]]
+                    counters[direction + '_octets'] = row[4]
+                    counters[direction + '_unicast_packets'] = row[1]
+                    counters[direction + '_multicast_packets'] = row[2]
+                    counters[direction + '_broadcast_packets'] = row[3]
         except Exception as err:
             raise Exception('Error parse interface counters. {0}'.format(err))
 
-        # данные выдаются в несколько таблиц
-        show_interfaces = self.device.send_command('show interfaces counters')
-        data_block = -1     # это состояние блока данных, пока читается заголово, он нафиг не нужен
-        data_part = 1       # какую таблицу сейчас читает, там их идет две, одна с tx другая с rx
+        return result
+
+    def _get_interface_errors(self, interfaces=None):
+        """Return {interface: (rx_error, tx_error)} from "show interfaces", cached if counters_errors_ttl is set."""
+        key = ' '.join(interfaces) if interfaces is not None else ''
+        if self.errors_cache is not None:
+            errors = self.errors_cache.get(key)
+            if errors is not None:
+                return errors
+
+        show_interfaces = self._show_interfaces(interfaces)
         if not show_interfaces:
             return {}
-
         try:
-            # режем вывод на строки и собираем блоки из таблиц
-            for line in (show_interfaces + '\n\r').splitlines():
-                if data_block != -1 and line != '':
-                    # если заголовок уже прошли и не наткнулись на конец страницы, то продолжаем собирать блок
-                    data_block += line + "\n"
-                if line == '':
-                    # если дошли до конца таблицы, то начинаем ее разбирать
-
-                    # временная переменная, что бы хранить преыдущую строку
-                    # т.к. если данные не вошли в строку, то они продолжаются на следующей
-                    prev = None
-
-                    # кормим текст панде, она отдает таблицу, говорим, что заголовка нет и что все данные текстовые
-                    d = pd.read_fwf(StringIO(data_block), header=None, dtype={0: str, 1: str, 2: str, 3: str, 4: str})
-
-                    # пошли по строкам
-                    for i in d.index:
-                        row = d.values[i]
-                        # если идет таблица с rx
-                        if data_part == 1:
-                            # если наткнулись на "перенесенные" данные, то добавляем их в прошлой строке
-                            if str(row[0]) == 'nan':
-                                interfaces[prev[0]].update({
-                                    'rx_octets': interfaces[prev[0]]['rx_octets'] + ('' if str(row[4]) == 'nan' else row[4]),
-                                    'rx_unicast_packets': interfaces[prev[0]]['rx_unicast_packets'] + ('' if str(row[1]) == 'nan' else row[1]),
-                                    'rx_multicast_packets': interfaces[prev[0]]['rx_multicast_packets'] + ('' if str(row[2]) == 'nan' else row[2]),
-                                    'rx_broadcast_packets': interfaces[prev[0]]['rx_broadcast_packets'] + ('' if str(row[3]) == 'nan' else row[3])
-                                })
-                            else:
-                                interfaces[row[0]].update({
-                                    'rx_octets': row[4],
-                                    'rx_unicast_packets': row[1],
-                                    'rx_multicast_packets': row[2],
-                                    'rx_broadcast_packets': row[3]
-                                })
-                                prev = row
-                        # если идет таблица rx
-                        else:
-                            if str(row[0]) == 'nan':
-                                interfaces[prev[0]].update({
-                                    'tx_octets': interfaces[prev[0]]['tx_octets'] + ('' if str(row[4]) == 'nan' else row[4]),
-                                    'tx_unicast_packets': interfaces[prev[0]]['tx_unicast_packets'] + ('' if str(row[1]) == 'nan' else row[1]),
-                                    'tx_multicast_packets': interfaces[prev[0]]['tx_multicast_packets'] + ('' if str(row[2]) == 'nan' else row[2]),
-                                    'tx_broadcast_packets': interfaces[prev[0]]['tx_broadcast_packets'] + ('' if str(row[3]) == 'nan' else row[3])
-                                })
-                            else:
-                                interfaces[row[0]].update({
-                                    'tx_octets': row[4],
-                                    'tx_unicast_packets': row[1],
-                                    'tx_multicast_packets': row[2],
-                                    'tx_broadcast_packets': row[3]
-                                })
-                                prev = row
-
-                    data_block = -1
-                    if data_part == 1:
-                        data_part = 2
-                    else:
-                        data_part = 1
-                if '-------' in line:
-                    data_block = ''
+            errors = {
+                interface_name: (record['rx_error'], record['tx_error'])
+                for interface_name, record in self._parse_show_interfaces(show_interfaces).items()
+            }
         except Exception as err:
             raise Exception('Error parse interface counters. {0}'.format(err))
 
-        return interfaces
+        if self.errors_cache is not None:
+            self.errors_cache.set(key, errors)
+        return errors
+
+    @instrumented
+    def get_interfaces_counters_rates(self, interfaces=None):
+        """
+        Return interfaces counters deltas and per-second rates since the previous call.
+
+        The first call only stores a baseline. After a device reboot (uptime went back)
+        the counters are re-baselined and 'reset' is True.
+
+        Sample output:
+        {
+            'interval': 300.0,
+            'reset': False,
+            'deltas': {'gi1/0/1': {'rx_octets': 1500000, 'tx_octets': 300000, ...}},
+            'rates': {'gi1/0/1': {'rx_octets': 5000.0, 'tx_octets': 1000.0, ...}}
+        }
+        """
+        counters = self.get_interfaces_counters(interfaces=interfaces)
+        if self.result_format == 'columns':
+            counters = counters.to_napalm()
+        return self.counter_tracker.update(counters, uptime=self._get_uptime())
+
+    def _get_uptime(self):
+        """Return device uptime in seconds, -1 if unknown."""
+        # аптайм из кэша устарел бы, и CounterTracker принял бы его за перезагрузку
+        self.invalidate_cache('show system')
+        show_system = self._send_command('show system')
+        if not show_system:
+            return -1
+        return self._parse_show_system(show_system)['uptime']
 
     def get_environment(self):
         """
@@ -638,6 +1221,7 @@ class CEDriver(NetworkDriver):
 
         return environment
 
+    @instrumented
     def get_arp_table(self, vrf=""):
         """
         Get arp table information.
@@ -669,42 +1253,70 @@ class CEDriver(NetworkDriver):
             raise NotImplementedError(msg)
 
         arp_table = []
-        show_arp = self.device.send_command('show arp')
+        show_arp = self._send_command('show arp')
 
         if not show_arp:
-            return {}
+            return ArpColumns(self.hostname) if self.result_format == 'columns' else {}
 
         try:
-            re_ip = r'(((25[0-5]|2[0-4][0-9]|[0-1]?[0-9][0-9]?)\.){3}(25[0-5]|2[0-4][0-9]|[0-1]?[0-9][0-9]?))'
-            re_mac = r'([0-9a-fA-F]{2}(([:\-]?)[0-9a-fA-F]{2}){5})'
-
-            data_block = -1
-            for line in show_arp.splitlines():
-                if data_block != -1:
-                    data_block += line + '\n\r'
-                if '-----' in line:
-                    data_block = ''
-            d = pd.read_fwf(StringIO(data_block), header=None, dtype={0: str, 1: str, 2: str, 3: str, 4: str})
-            for i in d.index:
-                row = d.values[i]
-                if (len(re.findall(re_mac, row[3])) > 0) and (len(re.findall(re_ip, row[2])) > 0):
-                    arp_table.append({
-                        'interface': row[1],
-                        'mac': row[3],
-                        'ip': row[2],
-                        'age': -1
-                    })
-                if (len(re.findall(re_mac, row[4])) > 0) and (len(re.findall(re_ip, row[3])) > 0):
-                    arp_table.append({
-                        'interface': row[2],
-                        'mac': row[4],
-                        'ip': row[3],
-                        'age': -1
-                    })
+            for row in read_fixed_width(table_body(show_arp.splitlines())):
+                row.extend([None] * (5 - len(row)))
+                # в зависимости от выравнивания колонок адреса стоят либо в 2-3, либо в 3-4 колонке
+                if row[3] and row[2] and RE_MAC.search(row[3]) and RE_IPV4.search(row[2]):
+                    arp_table.append(self._arp_entry(row[1], row[3], row[2]))
+                if row[4] and row[3] and RE_MAC.search(row[4]) and RE_IPV4.search(row[3]):
+                    arp_table.append(self._arp_entry(row[2], row[4], row[3]))
+            if self.result_format == 'columns':
+                # строки таблицы собраны кортежами, в колонки переводятся разом
+                rows, arp_table = arp_table, ArpColumns(self.hostname)
+                arp_table.extend(rows)
         except Exception as err:
             raise Exception('Error parse arp table. {0}'.format(err))
         return arp_table
 
+    def _arp_entry(self, interface, mac, ip):
+        """Return a get_arp_table entry in the configured result format (a tuple for result_format='columns')."""
+        if self.result_format == 'columns':
+            return interface, mac, ip
+        if self.result_format == 'records':
+            return ArpEntry(sys.intern(interface), mac, ip)
+        return {
+            'interface': interface,
+            'mac': mac,
+            'ip': ip,
+            'age': -1
+        }
+
+    @instrumented
+    def get_arp_snapshot(self, vrf=""):
+        """
+        Return the ARP table as an ArpTable indexed by IP and by MAC.
+
+        snapshot.lookup_ip('10.0.0.1') returns one entry or None, snapshot.lookup_mac(mac)
+        a list of entries, list(snapshot) the get_arp_table list.
+        """
+        arp_table = self.get_arp_table(vrf=vrf)
+        return ArpTable(arp_table or [])
+
+    @instrumented
+    def get_arp_entry(self, ip=None, mac=None, refresh=False):
+        """
+        Return ARP entries of an IP and/or MAC address from the last ARP snapshot.
+
+        The snapshot is taken on the first call and with refresh=True.
+        """
+        if ip is None and mac is None:
+            raise ValueError('ip or mac must be provided')
+        if self.arp_snapshot is None or refresh:
+            self.arp_snapshot = self.get_arp_snapshot()
+        if ip is None:
+            return self.arp_snapshot.lookup_mac(mac)
+        entry = self.arp_snapshot.lookup_ip(ip)
+        if entry is None or (mac is not None and self.arp_snapshot.lookup_mac(mac).count(entry) == 0):
+            return []
+        return [entry]
+
+    @instrumented
     def get_config(self, retrieve="all", full=False, sanitized=False):
         """
         Get config from device.
@@ -712,6 +1324,10 @@ class CEDriver(NetworkDriver):
         Returns the running configuration as dictionary.
         The candidate and startup are always empty string for now,
         since CE does not support candidate configuration.
+
+        With the 'config_transfer' optional argument ('sftp' or 'scp') the configuration
+        files are copied from the device instead of printed by the CLI, and verified
+        by size (SFTP) or by MD5 if 'md5_command' is set.
         """
         config = {
             'startup': '',
@@ -719,14 +1335,21 @@ class CEDriver(NetworkDriver):
             'candidate': ''
         }
 
+        if self.config_transfer:
+            for name in ('running', 'startup'):
+                if retrieve.lower() in (name, 'all'):
+                    config[name] = self._transfer_config(self.config_files[name])
+            return config
+
         if retrieve.lower() in ('running', 'all'):
             command = 'show running-config'
-            config['running'] = str(self.device.send_command(command))
+            config['running'] = str(self._send_command(command))
         if retrieve.lower() in ('startup', 'all'):
             command = 'show startup-config'
-            config['startup'] = str(self.device.send_command(command))
+            config['startup'] = str(self._send_command(command))
         return config
 
+    @instrumented
     def get_lldp_neighbors(self):
         """
         Return LLDP neighbors details.
@@ -756,34 +1379,27 @@ class CEDriver(NetworkDriver):
 
         neighbors = {}
 
-        show_neighbors = self.device.send_command('show lldp neighbors')
+        show_neighbors = self._send_command('show lldp neighbors')
         show_neighbors = re.sub('(([0-9A-Fa-f]{2}[ ]){4}([0-9A-Fa-f]{2}))', mask_device_id, show_neighbors)
 
         if not show_neighbors:
             return {}
 
         try:
-            data_block = -1
-            for line in show_neighbors.splitlines():
-                if data_block != -1:
-                    # if '                          ' in line:
-                    #     line = ';' + line
-                    data_block += ';'.join(str(line).replace('                 ', ';').replace(', ', '-').strip().split()) + '\n\r'
-                if '------' in line:
-                    data_block = ''
-            # print(data_block)
-            d = pd.read_csv(StringIO(data_block), delimiter=';', header=None, dtype={0: str, 1: str, 2: str, 3: str, 4: str, 5: str})
+            data_block = [
+                ';'.join(str(line).replace('                 ', ';').replace(', ', '-').strip().split())
+                for line in table_body(show_neighbors.splitlines(), '------')
+            ]
             prev = 0
             # пошли по строкам
-            for i in d.index:
-                row = d.values[i]
+            for row in read_delimited(data_block, delimiter=';', ncols=4):
                 # если наткнулись на "перенесенные" данные, то добавляем их в прошлой строке
-                if str(row[0]) == 'nan':
+                if row[0] is None:
                     _hostname = ''
                     _port = ''
-                    if str(row[1]) != 'nan':
+                    if row[1] is not None:
                         _port = str(row[1])
-                    if str(row[2]) != 'nan':
+                    if row[2] is not None:
                         _hostname = str(row[2])
                     # print(row, row[1], row[2], len(row), _port, _hostname, neighbors[prev[0]])
                     neighbors[prev[0]][0] = {
@@ -796,7 +1412,7 @@ class CEDriver(NetworkDriver):
                         # в хост пишем system name, если его нет, то используем divice id
                         # если device id был формата aa aa aa aa aa, то он выше был обращен в aa_aa_aa_aa_aa
                         # тогда возвращаем device id в прежний формат
-                        'hostname': (re.sub('(([0-9A-Fa-f]{2}[_]){4}([0-9A-Fa-f]{2}))', demask_device_id, str(row[1])) if str(row[3]) == 'nan' else str(row[3])),
+                        'hostname': (re.sub('(([0-9A-Fa-f]{2}[_]){4}([0-9A-Fa-f]{2}))', demask_device_id, str(row[1])) if row[3] is None else str(row[3])),
                         'port': str(row[2])
                     })
                     prev = row
@@ -806,6 +1422,7 @@ class CEDriver(NetworkDriver):
 
         return neighbors
 
+    @instrumented
     def get_mac_address_table(self):
         """
         Return the MAC address table.
@@ -832,34 +1449,59 @@ class CEDriver(NetworkDriver):
             }
         ]
         """
-        mac_address_table = []
-        show_mac = self.device.send_command('show mac address-table')
-        if not show_mac:
-            return []
-
-        try:
-            data_block = -1
-            for line in show_mac.splitlines():
-                if data_block != -1:
-                    data_block += line + '\n\r'
-                if '-----' in line:
-                    data_block = ''
-            d = pd.read_fwf(StringIO(data_block), header=None, dtype={0: str, 1: str, 2: str, 3: str})
-            for i in d.index:
-                row = d.values[i]
-                mac_address_table.append({
-                    "active": True,
-                    "interface": row[2],
-                    "last_move": -1.0,
-                    "mac": row[1],
-                    "moves": -1,
-                    "static": (False if row[3] == 'dynamic' else True),
-                    "vlan": row[0]
-                })
-        except Exception as err:
-            raise Exception('Error parse mac address table. {0}'.format(err))
-        return mac_address_table
+        if self.result_format == 'columns':
+            table = MacColumns(self.hostname)
+            table.extend(self._iter_mac_rows())
+            return table
+        return list(self.iter_mac_address_table())
+
+    def iter_mac_address_table(self):
+        """
+        Iterate over the MAC address table while the device prints it.
+
+        Yields entries in the get_mac_address_table format one at a time, the output
+        of "show mac address-table" is never held in memory as a whole.
+        The generator should be consumed to the end, otherwise the rest of the
+        output is read and dropped when it is closed. With 'snmp_community' the
+        table is read over SNMP (Q-BRIDGE-MIB) instead. Entries are dicts, or
+        MacEntry records with result_format='records'.
+        """
+        for vlan, mac, interface, static in self._iter_mac_rows():
+            if self.result_format == 'records':
+                # имена портов и VLAN повторяются тысячи раз, храним по одной копии строки
+                yield MacEntry(sys.intern(interface), mac, static, sys.intern(vlan))
+                continue
+            yield {
+                "active": True,
+                "interface": interface,
+                "last_move": -1.0,
+                "mac": mac,
+                "moves": -1,
+                "static": static,
+                "vlan": vlan
+            }
 
+    def _iter_mac_rows(self):
+        """Yield (vlan, mac, interface, static) of the MAC address table."""
+        if self.snmp is not None:
+            for entry in self.snmp.iter_mac_address_table():
+                yield entry['vlan'], entry['mac'], entry['interface'], entry['static']
+            return
+
+        _head_end = False
+        for line in self._iter_command_lines('show mac address-table'):
+            if '-----' in line:
+                _head_end = True
+                continue
+            if not _head_end:
+                continue
+            # Vlan, Mac Address, Port, Type
+            row = line.split()
+            if len(row) < 4:
+                continue
+            yield row[0], row[1], row[2], (False if row[3] == 'dynamic' else True)
+
+    @instrumented
     def get_users(self):
         """
         Return the configuration of the users.
@@ -878,13 +1520,24 @@ class CEDriver(NetworkDriver):
 
         return users
 
+    @instrumented
     def rollback(self):
-        """
-        Rollback to previous commit.
-        ! Not implemented
-        """
-        pass
+        """Rollback to the config saved by the last commit_config()."""
+        if not self.changed or not self.backup_file:
+            return
+        with open(self.backup_file, 'r', encoding='utf-8') as fs:
+            backup = fs.read()
+        self.invalidate_cache()
+        running_config = self.get_config(retrieve='running')['running']
+        self._commit_merge(push_commands(running_config, backup, replace=True))
+        self.invalidate_cache()
+        if self.commit_save:
+            self._save_startup()
+        self.changed = False
+        self._delete_file(self.backup_file)
+        self.backup_file = ''
 
+    @instrumented
     def ping(self, destination, source=c.PING_SOURCE, ttl=c.PING_TTL, timeout=c.PING_TIMEOUT, size=c.PING_SIZE,
              count=c.PING_COUNT, vrf=c.PING_VRF, **kwargs):
         """Execute ping on the device.
@@ -901,7 +1554,7 @@ class CEDriver(NetworkDriver):
         # if source != '':
         #     command += ' -a {}'.format(source)
         command += ' {}'.format(destination)
-        output = self.device.send_command(command)
+        output = self._device_send_command(command)
 
         if 'Error' in output:
             ping_dict['error'] = output
@@ -1056,20 +1709,33 @@ class CEDriver(NetworkDriver):
         return new_interfaces
 
     def _delete_file(self, filename):
-        """
-        ! Not implemented
-        """
-        #command = 'delete /unreserved /quiet {0}'.format(filename)
-        #self.device.send_command(command)
-        pass
+        """Delete a local backup or candidate file."""
+        if os.path.isfile(filename):
+            os.remove(filename)
 
     def _save_config(self, filename=''):
         """
-        Save the current running config to the given file.
-        ! Not implemented
+        Save the current running config to the given (local) file, return its name.
+
+        Without filename a temporary file is created.
         """
-        pass
-        #command = 'save {}'.format(filename)
+        if not filename:
+            fd, filename = tempfile.mkstemp(prefix='napalm-eltex-backup-', suffix='.cfg')
+            os.close(fd)
+        self.invalidate_cache()
+        running_config = self.get_config(retrieve='running')['running']
+        with open(filename, 'w', encoding='utf-8') as fs:
+            fs.write(running_config)
+        return filename
+
+    def _save_startup(self):
+        """Copy the running config to startup-config."""
+        with self.channel_lock:
+            output = self.device.send_command_timing('write memory')
+            if 'Y/N' in output:
+                output += self.device.send_command_timing('Y')
+            self.last_activity = time.monotonic()
+        return output
 
     def _load_config(self, config_file):
         """
@@ -1083,11 +1749,55 @@ class CEDriver(NetworkDriver):
         """
         pass
 
+    def _transfer_config(self, filename):
+        """Copy a configuration file from the device, verify and return its text."""
+        fd, local_file = tempfile.mkstemp(prefix='napalm-eltex-', suffix='.cfg')
+        os.close(fd)
+        try:
+            size = self._verify_remote_file_exists(filename)
+            self._get_remote_file(filename, local_file)
+            if size is not None and os.path.getsize(local_file) != size:
+                raise Exception('Error copy {0}: {1} bytes of {2}'.format(
+                    filename, os.path.getsize(local_file), size))
+            if self.md5_command and not self._check_md5(filename, local_file):
+                raise Exception('Error copy {0}: MD5 mismatch'.format(filename))
+            with open(local_file, 'r', encoding='utf-8', errors='replace') as fs:
+                return fs.read()
+        finally:
+            os.remove(local_file)
+
+    def _get_remote_file(self, src, dst):
+        """Copy src from the device to the local file dst over the SSH session."""
+        if not hasattr(self.device, 'remote_conn_pre'):
+            raise ConnectionException('File transfer needs an SSH connection')
+        transport = self.device.remote_conn_pre.get_transport()
+        try:
+            if self.config_transfer == 'scp':
+                with SCPClient(transport, socket_timeout=self.timeout) as scp:
+                    scp.get(src, dst)
+            elif self.config_transfer == 'sftp':
+                with paramiko.SFTPClient.from_transport(transport) as sftp:
+                    sftp.get_channel().settimeout(self.timeout)
+                    sftp.get(src, dst)
+            else:
+                raise ConnectionException('Unknown config transfer: {0}'.format(self.config_transfer))
+        except (IOError, paramiko.SSHException) as err:
+            raise Exception('Error copy {0}. {1}'.format(src, err))
+
     def _verify_remote_file_exists(self, dst, file_system='flash:'):
         """
-        ! Not implemented
+        Return size of the file on the device, None if it can not be checked (SCP).
+
+        Raises an exception if the file does not exist.
         """
-        pass
+        if self.config_transfer != 'sftp':
+            return None
+        transport = self.device.remote_conn_pre.get_transport()
+        try:
+            with paramiko.SFTPClient.from_transport(transport) as sftp:
+                return sftp.stat(dst).st_size
+        except IOError as err:
+            raise Exception('File {0} not found on the device. {1}'.format(dst, err))
 
     def _check_file_exists(self, cfg_file):
         """
@@ -1095,12 +1805,12 @@ class CEDriver(NetworkDriver):
         """
         return True
 
-    def _check_md5(self, dst):
-        """
-        ! Not implemented
-        """
-
-        return False
+    def _check_md5(self, dst, local_file=None):
+        """Compare MD5 of the file on the device with MD5 of its local copy."""
+        remote_md5 = self._get_remote_md5(dst)
+        if not remote_md5:
+            return False
+        return self._get_local_md5(local_file or dst) == remote_md5
 
     @staticmethod
     def _get_local_md5(dst, blocksize=2 ** 20):
@@ -1114,31 +1824,51 @@ class CEDriver(NetworkDriver):
         return md5.hexdigest()
 
     def _get_remote_md5(self, dst):
-        """
-        ! Not implemented
-        """
-
-        return ''
-
-    def _commit_merge(self):
-        """
-        ! Not implemented
-        """
-        pass
+        """Return MD5 of the file on the device printed by 'md5_command', '' if unknown."""
+        if not self.md5_command:
+            return ''
+        output = self._device_send_command(self.md5_command.format(dst))
+        match = RE_MD5.search(output)
+        return match.group(0).lower() if match else ''
+
+    def _commit_merge(self, commands):
+        """
+        Send config commands in chunks of 'config_chunk_size' lines.
+
+        Each chunk is written onto the channel at once, the next one is sent after the
+        prompts of the whole chunk came back. Raises CommitError if the device rejected
+        any command.
+        """
+        if not commands:
+            return
+        errors = []
+        # config_mode() у netmiko ждёт тишины в канале по две секунды, входим и выходим сами
+        self._send_pipelined(['configure terminal'])
+        try:
+            for start in range(0, len(commands), self.config_chunk_size):
+                chunk = commands[start:start + self.config_chunk_size]
+                for command, output in zip(chunk, self._send_pipelined(chunk)):
+                    # устройство сообщает об ошибке строкой, начинающейся с %
+                    if output.lstrip().startswith('%'):
+                        errors.append('{0}: {1}'.format(command, output.strip()))
+        finally:
+            self._send_pipelined(['end'])
+        if errors:
+            raise CommitError('Device rejected {0} commands: {1}'.format(len(errors), '; '.join(errors[:10])))
 
     def _get_merge_diff(self):
-        """
-        ! Not implemented
-        """
-        diff = []
-        return '\n'.join(diff)
+        """Return lines of the merge candidate missing from the running config."""
+        running_config = self.get_config(retrieve='running')['running']
+        return merge_diff(running_config, self.merge_candidate)
 
     def _get_diff(self, filename=None):
-        """
-        Get a diff between running config and a proposed file.
-        ! Not implemented
-        """
-        return ''
+        """Get a diff between running config and a proposed (local) file."""
+        if not filename:
+            return ''
+        with open(filename, 'r', encoding='utf-8') as fs:
+            candidate = fs.read()
+        running_config = self.get_config(retrieve='running')['running']
+        return diff_configs(running_config, candidate)
 
     def _enough_space(self, filename):
         """
@@ -1152,6 +1882,91 @@ class CEDriver(NetworkDriver):
         """
         return 0
 
+    @staticmethod
+    def _parse_show_system(show_system):
+        """Return model, uptime (seconds) and hostname from "show system" output."""
+        system = {
+            'model': u'Unknown',
+            'uptime': -1,
+            'hostname': u'Unknown'
+        }
+        for line in show_system.splitlines():
+            if 'System Description:' in line:
+                _, model = line.split('System Description:')
+                system['model'] = model.strip()
+            if 'System Up Time (days,hour:min:sec):' in line:
+                _, uptime = line.split('System Up Time (days,hour:min:sec):')
+                system['uptime'] = CEDriver._parse_eltex_uptime(uptime.strip())
+            if 'System Name:' in line:
+                _, hostname = line.split('System Name:')
+                system['hostname'] = hostname.strip()
+        return system
+
+    @staticmethod
+    def _parse_show_interfaces(show_interfaces):
+        """
+        Parse "show interfaces" output in a single pass over its lines.
+
+        Return a dict of per-interface records keyed by interface name, each record
+        holds the get_interfaces fields plus 'rx_error' and 'tx_error'.
+        """
+        interfaces = {}
+        record = None
+        for line in show_interfaces.splitlines():
+            # заголовок блока интерфейса: ------ show interfaces gi1/0/1 ------
+            if 'show interfaces' in line:
+                match = RE_IF_NAME.search(line)
+                if match:
+                    record = interfaces[match.group('ifname')] = {
+                        'description': '',
+                        'is_enabled': False,
+                        'is_up': False,
+                        'last_flapped': -1,
+                        'mac_address': '',
+                        'speed': 0,
+                        'mtu': 0,
+                        'rx_error': 0,
+                        'tx_error': 0
+                    }
+                    continue
+            if record is None:
+                continue
+
+            if 'is up ' in line:
+                record['is_up'] = True
+                record['is_enabled'] = True
+            if 'MAC address is' in line:
+                match = RE_IF_MAC.search(line)
+                if match:
+                    record['mac_address'] = match.group('ifmac')
+            if 'Description:' in line:
+                match = RE_IF_DESC.search(line)
+                if match:
+                    record['description'] = match.group('ifdesc')
+            if 'MTU is' in line:
+                match = RE_IF_MTU.search(line)
+                if match:
+                    record['mtu'] = int(match.group('ifmtu'))
+            if '-duplex' in line:
+                match = RE_IF_SPEED.search(line)
+                if match:
+                    record['speed'] = int(match.group('ifspeed'))
+            if 'Link is up for' in line:
+                match = RE_IF_UPTIME.search(line)
+                if match:
+                    record['last_flapped'] = int(match.group('days')) * DAY_SECONDS + \
+                                             int(match.group('hours')) * HOUR_SECONDS + \
+                                             int(match.group('minutes')) * 60 + int(match.group('seconds'))
+            if 'input errors' in line:
+                match = RE_IF_IN_ERR.search(line)
+                if match:
+                    record['rx_error'] = int(match.group('in_err'))
+            if 'output errors' in line:
+                match = RE_IF_OUT_ERR.search(line)
+                if match:
+                    record['tx_error'] = int(match.group('out_err'))
+        return interfaces
+
     @staticmethod
     def _parse_eltex_uptime(uptime_str):
         '''
@@ -1217,8 +2032,8 @@ class CEDriver(NetworkDriver):
 
     @staticmethod
     def _create_tmp_file(config):
-        """
-        ! Not implemented
-        """
-
-        return ''
+        """Write config to a temporary file, return its name."""
+        fd, filename = tempfile.mkstemp(prefix='napalm-eltex-candidate-', suffix='.cfg')
+        with os.fdopen(fd, 'w', encoding='utf-8') as fs:
+            fs.write(config)
+        return filename
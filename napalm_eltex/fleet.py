@@ -0,0 +1,215 @@
+"""
+Run getters across many devices over a bounded thread pool, locate MAC addresses across the fleet.
+"""
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from napalm_eltex.arp import mac_to_int
+from napalm_eltex.eltex import CEDriver
+
+RE_PORT_CHANNEL = re.compile(r'^po\d+$', re.IGNORECASE)
+
+
+def poll_device(device, getters, driver=CEDriver, deadline=None):
+    """
+    Open one device, run the getters on it and close it.
+
+    device is an inventory entry: a dict with 'hostname', 'username', 'password'
+    and optionally 'timeout' and 'optional_args'. getters is a list of getter names
+    or (name, kwargs) pairs. Errors are captured, never raised:
+
+    {
+        'hostname': '10.0.0.1',
+        'results': {'get_facts': {...}},
+        'errors': {'get_interfaces': 'Error parse interface data. ...'},
+        'elapsed': 1.52
+    }
+
+    With the 'stats' optional argument the result also has 'stats', the CommandStats of the device.
+    """
+    started = time.monotonic()
+    result = {
+        'hostname': device['hostname'],
+        'results': {},
+        'errors': {},
+        'elapsed': 0.0
+    }
+
+    try:
+        connection = driver(device['hostname'], device['username'], device['password'],
+                            timeout=device.get('timeout', 60), optional_args=device.get('optional_args'))
+        connection.open()
+    except Exception as err:
+        result['errors']['open'] = str(err)
+        result['elapsed'] = time.monotonic() - started
+        return result
+
+    try:
+        for getter in getters:
+            name, kwargs = (getter, {}) if isinstance(getter, str) else getter
+            if deadline is not None and time.monotonic() > deadline:
+                result['errors'][name] = 'Device timeout exceeded'
+                continue
+            try:
+                result['results'][name] = getattr(connection, name)(**kwargs)
+            except Exception as err:
+                result['errors'][name] = str(err)
+    finally:
+        try:
+            connection.close()
+        except Exception as err:
+            result['errors']['close'] = str(err)
+        # с optional_args 'stats' отдаём и тайминги команд устройства
+        if getattr(connection, 'stats', None) is not None:
+            result['stats'] = connection.stats
+
+    result['elapsed'] = time.monotonic() - started
+    return result
+
+
+def collect(inventory, getters, max_workers=16, device_timeout=None, driver=CEDriver):
+    """
+    Poll every device of the inventory, yielding per-device results as they complete.
+
+    At most max_workers devices are polled at once. A device still running after
+    device_timeout seconds is reported with a 'timeout' error straight away, its
+    worker skips the remaining getters and its late result is dropped.
+    """
+    started = {}
+
+    def _worker(index, device):
+        now = time.monotonic()
+        started[index] = now
+        deadline = now + device_timeout if device_timeout is not None else None
+        return poll_device(device, getters, driver=driver, deadline=deadline)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = {}
+    try:
+        pending = {
+            executor.submit(_worker, index, device): (index, device)
+            for index, device in enumerate(inventory)
+        }
+        while pending:
+            done, _ = wait(pending, timeout=1.0 if device_timeout is not None else None,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                _, device = pending.pop(future)
+                try:
+                    yield future.result()
+                except Exception as err:
+                    yield {'hostname': device['hostname'], 'results': {}, 'errors': {'poll': str(err)}, 'elapsed': 0.0}
+
+            if device_timeout is None:
+                continue
+            now = time.monotonic()
+            for future, (index, device) in list(pending.items()):
+                begin = started.get(index)
+                if begin is not None and now - begin > device_timeout:
+                    del pending[future]
+                    yield {
+                        'hostname': device['hostname'],
+                        'results': {},
+                        'errors': {'timeout': 'No result in {0} seconds'.format(device_timeout)},
+                        'elapsed': now - begin
+                    }
+    finally:
+        # вызывающий бросил итерацию раньше: устройства из очереди не опрашиваем
+        # (cancel_futures у shutdown появился только в 3.9)
+        for future in pending:
+            future.cancel()
+        # зависшие воркеры дорабатывают в фоне, не держим вызывающего
+        executor.shutdown(wait=False)
+
+
+class MacLocator(object):
+    """
+    Fleet-wide index MAC -> [(hostname, vlan, interface, edge)] built from get_mac_address_table.
+
+    Ports with an LLDP neighbor are uplinks, the rest are edge ports; a MAC learned on
+    several switches is located on the edge port first. edge_neighbor(neighbor) may
+    tell LLDP neighbors that are end hosts (IP phones, access points) from switches,
+    their ports stay edge ports. Port-channels (po1) are uplinks, or, when their
+    members are known, uplinks if a member is. Every device is refreshed on its own
+    with ingest().
+    """
+
+    def __init__(self, edge_neighbor=None):
+        self.edge_neighbor = edge_neighbor
+        self._index = {}
+        self._device_macs = {}
+        self.updated = {}
+
+    def ingest(self, hostname, mac_table, lldp_neighbors=None, lag_members=None):
+        """
+        Replace the entries of one device with its get_mac_address_table and get_lldp_neighbors results.
+
+        lag_members is {'po1': ['te1/0/1', 'te1/0/2']}, without it every port-channel is an uplink.
+        """
+        uplinks = set()
+        for interface, neighbors in (lldp_neighbors or {}).items():
+            if self.edge_neighbor is None or not all(self.edge_neighbor(neighbor) for neighbor in neighbors):
+                uplinks.add(interface)
+        # MAC за LAG изучается на po*, а LLDP видит соседа на портах-членах
+        for lag, members in (lag_members or {}).items():
+            if uplinks.intersection(members):
+                uplinks.add(lag)
+
+        self.forget(hostname)
+        macs = set()
+        for entry in mac_table:
+            mac = mac_to_int(entry['mac'])
+            interface = entry['interface']
+            edge = interface not in uplinks and (lag_members is not None or not RE_PORT_CHANNEL.match(interface))
+            location = (hostname, entry['vlan'], interface, edge)
+            self._index.setdefault(mac, []).append(location)
+            macs.add(mac)
+        self._device_macs[hostname] = macs
+        self.updated[hostname] = time.time()
+
+    def forget(self, hostname):
+        """Drop all entries of a device."""
+        for mac in self._device_macs.pop(hostname, ()):
+            locations = [location for location in self._index[mac] if location[0] != hostname]
+            if locations:
+                self._index[mac] = locations
+            else:
+                del self._index[mac]
+        self.updated.pop(hostname, None)
+
+    def locate(self, mac):
+        """Return all locations of a MAC, edge ports first."""
+        locations = self._index.get(mac_to_int(mac), ())
+        return [
+            {'hostname': hostname, 'vlan': vlan, 'interface': interface, 'edge': edge}
+            for hostname, vlan, interface, edge in sorted(locations, key=lambda location: not location[3])
+        ]
+
+    def find(self, mac):
+        """Return the most likely location of a MAC (an edge port if there is one) or None."""
+        locations = self.locate(mac)
+        return locations[0] if locations else None
+
+    def refresh(self, inventory, max_workers=16, device_timeout=None, driver=CEDriver):
+        """
+        Poll the MAC tables and LLDP neighbors of the inventory devices and ingest them.
+
+        Devices that failed keep their previous entries. Return {hostname: errors} of them.
+        """
+        failed = {}
+        for result in collect(inventory, ['get_mac_address_table', 'get_lldp_neighbors'],
+                              max_workers=max_workers, device_timeout=device_timeout, driver=driver):
+            results = result['results']
+            # без соседей LLDP аплинки не отличить от портов доступа
+            if 'get_mac_address_table' not in results or 'get_lldp_neighbors' not in results:
+                failed[result['hostname']] = result['errors']
+                continue
+            self.ingest(result['hostname'], results['get_mac_address_table'], results['get_lldp_neighbors'])
+        return failed
+
+    def __contains__(self, mac):
+        return mac_to_int(mac) in self._index
+
+    def __len__(self):
+        return len(self._index)
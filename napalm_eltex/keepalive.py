@@ -0,0 +1,58 @@
+"""
+Background keepalive of long-lived CEDriver sessions.
+"""
+import threading
+import time
+
+
+class Keepalive(threading.Thread):
+    """
+    Keep an idle session of the driver alive from a daemon thread.
+
+    Every ``interval`` seconds of idleness it sends an SSH keepalive global request
+    without reply (mode='ssh', nothing reaches the CLI) or a new line to the CLI
+    (mode='cli', also resets the exec-timeout of the switch). A failed probe marks
+    the session dead, is_alive() then reports it without touching the connection.
+    The 'ssh' mode sends what the transport keepalive of paramiko (the netmiko
+    'keepalive' argument) does, the driver turns that one off when the thread is used.
+    """
+
+    def __init__(self, driver, interval=60.0, mode='ssh'):
+        super(Keepalive, self).__init__(name='napalm-eltex-keepalive-{0}'.format(driver.hostname), daemon=True)
+        if mode not in ('ssh', 'cli'):
+            raise ValueError('Unknown keepalive mode: {0}'.format(mode))
+        self.driver = driver
+        self.interval = interval
+        self.mode = mode
+        self.failed = False
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """Stop the thread and wait for it."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval / 4.0):
+            driver = self.driver
+            if time.monotonic() - driver.last_activity < self.interval:
+                continue
+            # сессию занимает команда, значит она и так не простаивает
+            if not driver.channel_lock.acquire(blocking=False):
+                continue
+            try:
+                device = driver.device
+                if device is None:
+                    return
+                if self.mode == 'ssh':
+                    device.remote_conn.get_transport().global_request('keepalive@lag.net', wait=False)
+                else:
+                    device.write_channel(device.RETURN)
+                    device.read_until_prompt(read_timeout=driver.timeout)
+                driver.last_activity = time.monotonic()
+            except Exception:
+                self.failed = True
+                return
+            finally:
+                driver.channel_lock.release()
@@ -0,0 +1,117 @@
+"""
+Pool of warm SSH sessions shared by CEDriver instances.
+"""
+import hashlib
+import threading
+import time
+
+from napalm.base.exceptions import ConnectionException
+
+
+def connect_with_backoff(connect, attempts=3, backoff=1.0, max_backoff=30.0):
+    """
+    Call connect() until it succeeds, at most attempts times.
+
+    The pause before the next attempt starts at backoff seconds and doubles up to
+    max_backoff. The error of the last attempt is raised.
+    """
+    delay = backoff
+    for attempt in range(attempts):
+        try:
+            return connect()
+        except ConnectionException:
+            if attempt == attempts - 1:
+                raise
+        time.sleep(delay)
+        delay = min(delay * 2, max_backoff)
+
+
+def session_alive(session):
+    """Return True if the SSH transport and the shell channel of a netmiko session are open."""
+    channel = getattr(session, 'remote_conn', None)
+    if channel is None:
+        # не SSH-сессия (например, ReplayDevice), в пуле ей не место
+        return False
+    transport = channel.get_transport()
+    return (transport is not None and transport.is_active()
+            and not channel.closed and not channel.eof_received)
+
+
+class SessionPool(object):
+    """
+    Idle sessions by (hostname, port, username, password hash).
+
+    A driver opened with the pool takes an idle session of its device if there is
+    a live one and puts it back on close() instead of disconnecting. Sessions idle
+    longer than max_idle seconds (keep it under the exec-timeout of the switches)
+    are disconnected, at most max_idle_per_key sessions of a device are kept.
+    """
+
+    def __init__(self, max_idle=300.0, max_idle_per_key=4):
+        self.max_idle = max_idle
+        self.max_idle_per_key = max_idle_per_key
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(hostname, port, username, password):
+        return hostname, port, username, hashlib.sha256((password or '').encode('utf-8')).hexdigest()
+
+    def acquire(self, key, connect, attempts=3, backoff=1.0, max_backoff=30.0):
+        """Return a live idle session of key, or a new one from connect() (retried with backoff)."""
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                sessions = self._idle.get(key)
+                if not sessions:
+                    break
+                session, released = sessions.pop()
+            if now - released <= self.max_idle and session_alive(session):
+                return session
+            self._disconnect(session)
+        return connect_with_backoff(connect, attempts=attempts, backoff=backoff, max_backoff=max_backoff)
+
+    def release(self, key, session):
+        """Put a session back, a dead one is dropped."""
+        if not session_alive(session):
+            self._disconnect(session)
+            return
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            sessions = self._idle.setdefault(key, [])
+            sessions.append((session, now))
+            while len(sessions) > self.max_idle_per_key:
+                expired.append(sessions.pop(0)[0])
+            for other in self._idle.values():
+                expired.extend(item[0] for item in other if now - item[1] > self.max_idle)
+                other[:] = [item for item in other if now - item[1] <= self.max_idle]
+        for expired_session in expired:
+            self._disconnect(expired_session)
+
+    def discard(self, session):
+        """Disconnect a session that is not coming back to the pool."""
+        self._disconnect(session)
+
+    def close(self):
+        """Disconnect all idle sessions."""
+        with self._lock:
+            sessions = [item[0] for items in self._idle.values() for item in items]
+            self._idle = {}
+        for session in sessions:
+            self._disconnect(session)
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(items) for items in self._idle.values())
+
+    @staticmethod
+    def _disconnect(session):
+        try:
+            session.disconnect()
+        except Exception:
+            pass
+
+
+# пул по умолчанию для optional_args {'session_pool': True}
+default_pool = SessionPool()
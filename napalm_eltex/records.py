@@ -0,0 +1,100 @@
+"""
+Compact records for MAC, ARP and interface counter results.
+
+Records keep their fields in __slots__ instead of a per-entry dict and behave as
+mappings with a fixed set of NAPALM keys: record['mac'], dict(record) and
+record == {...} work as with the dict results, to_dict() converts explicitly
+(for json.dumps and the like). Slot fields can be reassigned (the counters
+parser fills them in as it goes), keys cannot be added or deleted and constant
+fields (MacEntry.active and the like) cannot be changed.
+"""
+from collections.abc import MutableMapping
+
+from napalm_eltex.counters import COUNTER_FIELDS
+
+
+class Record(MutableMapping):
+    """Mutable mapping view over __slots__, keys are listed in KEYS (constant keys are class attributes)."""
+
+    __slots__ = ()
+    KEYS = ()
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        raise TypeError('{0} keys cannot be deleted'.format(type(self).__name__))
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def __repr__(self):
+        return '{0}({1})'.format(type(self).__name__, self.to_dict())
+
+    def __getstate__(self):
+        return tuple(getattr(self, key) for key in self.__slots__)
+
+    def __setstate__(self, state):
+        for key, value in zip(self.__slots__, state):
+            setattr(self, key, value)
+
+    def to_dict(self):
+        """Return the record as the NAPALM dict."""
+        return {key: getattr(self, key) for key in self.KEYS}
+
+
+class MacEntry(Record):
+    """get_mac_address_table entry."""
+
+    __slots__ = ('interface', 'mac', 'static', 'vlan')
+    KEYS = ('active', 'interface', 'last_move', 'mac', 'moves', 'static', 'vlan')
+    active = True
+    last_move = -1.0
+    moves = -1
+
+    def __init__(self, interface, mac, static, vlan):
+        self.interface = interface
+        self.mac = mac
+        self.static = static
+        self.vlan = vlan
+
+
+class ArpEntry(Record):
+    """get_arp_table entry."""
+
+    __slots__ = ('interface', 'mac', 'ip')
+    KEYS = ('interface', 'mac', 'ip', 'age')
+    age = -1
+
+    def __init__(self, interface, mac, ip):
+        self.interface = interface
+        self.mac = mac
+        self.ip = ip
+
+
+class InterfaceCounters(Record):
+    """get_interfaces_counters value of one interface, counters missing from the output are 0."""
+
+    __slots__ = COUNTER_FIELDS
+    KEYS = COUNTER_FIELDS
+
+    def __init__(self, **counters):
+        for key in COUNTER_FIELDS:
+            setattr(self, key, counters.get(key, 0))
+
+
+def to_dicts(result):
+    """Convert a result with records (a list, or a dict of interfaces) to plain NAPALM dicts."""
+    if isinstance(result, dict):
+        return {key: value.to_dict() if isinstance(value, Record) else value for key, value in result.items()}
+    return [entry.to_dict() if isinstance(entry, Record) else entry for entry in result]
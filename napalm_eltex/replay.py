@@ -0,0 +1,60 @@
+"""
+Connection stand-in which answers commands from stored outputs.
+
+Recorded sessions are directories with one file per command, the file name is
+the command with spaces replaced by underscores and slashes by "%": "show mac
+address-table" is stored in "show_mac_address-table.txt", "show interfaces gi1/0/1"
+in "show_interfaces_gi1%0%1.txt".
+"""
+import os
+
+from napalm.base.exceptions import CommandErrorException
+
+
+def fixture_name(command):
+    """Return the file name an output of the command is stored in."""
+    return command.strip().replace(' ', '_').replace('/', '%') + '.txt'
+
+
+class ReplayDevice(object):
+    """
+    Replaces the netmiko connection of CEDriver, serving "show ..." outputs from a dict
+    or from a directory of recorded outputs.
+    """
+
+    def __init__(self, outputs=None, directory=None):
+        self.outputs = outputs if outputs is not None else {}
+        self.directory = directory
+
+    def send_command(self, command_string, **kwargs):
+        """Return stored output of the command."""
+        if command_string in self.outputs:
+            return self.outputs[command_string]
+        if self.directory is not None:
+            path = os.path.join(self.directory, fixture_name(command_string))
+            if os.path.isfile(path):
+                with open(path, 'r', encoding='utf-8') as fs:
+                    return fs.read()
+        raise CommandErrorException('No recorded output for "{0}"'.format(command_string))
+
+    def disconnect(self):
+        pass
+
+
+def record_session(driver, directory, commands=None):
+    """
+    Save outputs of commands sent through an opened CEDriver into a directory.
+
+    By default records every command the getters use, plus the configs.
+    """
+    if commands is None:
+        # eltex импортирует этот модуль, поэтому импорт здесь
+        from napalm_eltex.eltex import GETTER_COMMANDS
+        commands = sorted({command for getter in GETTER_COMMANDS.values() for command in getter})
+        commands += ['show running-config', 'show startup-config']
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    for command in commands:
+        output = driver.device.send_command(command)
+        with open(os.path.join(directory, fixture_name(command)), 'w', encoding='utf-8') as fs:
+            fs.write(output)
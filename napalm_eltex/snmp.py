@@ -0,0 +1,166 @@
+"""
+SNMP backend for interface counters and the MAC address table (needs pysnmp>=7).
+
+Columns of IF-MIB and Q-BRIDGE-MIB are read with GETBULK walks, all columns of a
+getter are walked concurrently over one SNMP engine.
+"""
+import asyncio
+
+from napalm.base.exceptions import ConnectionException
+from napalm_eltex.counters import INTEGER_COUNTERS
+
+IF_TYPE = '1.3.6.1.2.1.2.2.1.3'
+IF_NAME = '1.3.6.1.2.1.31.1.1.1.1'
+
+# поле get_interfaces_counters: колонка IF-MIB
+COUNTER_OIDS = {
+    'rx_discards': '1.3.6.1.2.1.2.2.1.13',
+    'rx_error': '1.3.6.1.2.1.2.2.1.14',
+    'tx_discards': '1.3.6.1.2.1.2.2.1.19',
+    'tx_error': '1.3.6.1.2.1.2.2.1.20',
+    'rx_octets': '1.3.6.1.2.1.31.1.1.1.6',
+    'rx_unicast_packets': '1.3.6.1.2.1.31.1.1.1.7',
+    'rx_multicast_packets': '1.3.6.1.2.1.31.1.1.1.8',
+    'rx_broadcast_packets': '1.3.6.1.2.1.31.1.1.1.9',
+    'tx_octets': '1.3.6.1.2.1.31.1.1.1.10',
+    'tx_unicast_packets': '1.3.6.1.2.1.31.1.1.1.11',
+    'tx_multicast_packets': '1.3.6.1.2.1.31.1.1.1.12',
+    'tx_broadcast_packets': '1.3.6.1.2.1.31.1.1.1.13',
+}
+
+# ethernetCsmacd, ieee8023adLag - те же порты, что в "show interfaces counters"
+PORT_IF_TYPES = (6, 161)
+
+DOT1D_BASE_PORT_IF_INDEX = '1.3.6.1.2.1.17.1.4.1.2'
+DOT1Q_TP_FDB_PORT = '1.3.6.1.2.1.17.7.1.2.2.1.2'
+DOT1Q_TP_FDB_STATUS = '1.3.6.1.2.1.17.7.1.2.2.1.3'
+FDB_STATUS_LEARNED = 3
+
+
+class SnmpBackend(object):
+    """
+    Serve get_interfaces_counters and get_mac_address_table of CEDriver over SNMP v2c.
+
+    Results have the same shape and value types as the CLI getters. The FDB id of
+    dot1qTpFdbTable is taken as the VLAN id, as Eltex MES switches use IVL.
+    """
+
+    def __init__(self, hostname, community, port=161, timeout=2.0, retries=1, max_repetitions=25):
+        self.hostname = hostname
+        self.community = community
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.max_repetitions = max_repetitions
+        # движок SNMP и его цикл событий живут между опросами, создание движка дорогое
+        self._loop = None
+        self._engine = None
+        self._target = None
+        # pysnmp.hlapi, импортируется при первом опросе (импорт pysnmp занимает ~0.2 с)
+        self._hlapi = None
+
+    def close(self):
+        """Release the SNMP engine and its event loop."""
+        if self._engine is not None:
+            self._engine.close_dispatcher()
+        if self._loop is not None:
+            # даём отменённым задачам диспетчера завершиться
+            pending = asyncio.all_tasks(self._loop)
+            if pending:
+                self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self._loop.close()
+        self._loop = None
+        self._engine = None
+        self._target = None
+
+    def walk(self, *columns):
+        """Return {column: {index: value}} for the column OIDs, index is the OID suffix as a tuple of ints."""
+        if self._hlapi is None:
+            try:
+                from pysnmp.hlapi.v3arch import asyncio as hlapi
+            except ImportError:
+                raise ConnectionException('SNMP backend requires pysnmp')
+            self._hlapi = hlapi
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self._walk_columns(columns))
+
+    async def _walk_columns(self, columns):
+        if self._engine is None:
+            self._engine = self._hlapi.SnmpEngine()
+            self._target = await self._hlapi.UdpTransportTarget.create(
+                (self.hostname, self.port), timeout=self.timeout, retries=self.retries)
+        tables = await asyncio.gather(*[self._walk(self._engine, self._target, column) for column in columns])
+        return dict(zip(columns, tables))
+
+    async def _walk(self, engine, target, column):
+        hlapi = self._hlapi
+        prefix = tuple(int(item) for item in column.split('.'))
+        table = {}
+        async for error_indication, error_status, error_index, var_binds in hlapi.bulk_walk_cmd(
+                engine, hlapi.CommunityData(self.community, mpModel=1), target, hlapi.ContextData(),
+                0, self.max_repetitions, hlapi.ObjectType(hlapi.ObjectIdentity(column)),
+                lexicographicMode=False, lookupMib=False):
+            if error_indication:
+                raise ConnectionException('SNMP walk of {0} on {1} failed. {2}'.format(
+                    column, self.hostname, error_indication))
+            if error_status:
+                raise Exception('Error SNMP walk of {0}. {1}'.format(column, error_status.prettyPrint()))
+            for oid, value in var_binds:
+                oid = tuple(oid)
+                if oid[:len(prefix)] != prefix:
+                    continue
+                table[oid[len(prefix):]] = value
+        return table
+
+    def _port_names(self, if_types, if_names):
+        """Return {ifIndex: name} of physical ports and port-channels."""
+        return {
+            index[0]: str(if_names[index])
+            for index, if_type in if_types.items()
+            if int(if_type) in PORT_IF_TYPES and index in if_names
+        }
+
+    def get_interfaces_counters(self, interfaces=None):
+        """Return interfaces counters in the CEDriver.get_interfaces_counters format."""
+        columns = self.walk(IF_TYPE, IF_NAME, *COUNTER_OIDS.values())
+        names = self._port_names(columns[IF_TYPE], columns[IF_NAME])
+        if interfaces is not None:
+            wanted = set(interfaces)
+            names = {if_index: name for if_index, name in names.items() if name in wanted}
+
+        result = {}
+        for if_index, name in names.items():
+            counters = {}
+            for field, column in COUNTER_OIDS.items():
+                value = int(columns[column].get((if_index,), 0))
+                counters[field] = value if field in INTEGER_COUNTERS else str(value)
+            result[name] = counters
+        return result
+
+    def iter_mac_address_table(self):
+        """Yield MAC address table entries in the CEDriver.get_mac_address_table format."""
+        columns = self.walk(IF_NAME, DOT1D_BASE_PORT_IF_INDEX, DOT1Q_TP_FDB_PORT, DOT1Q_TP_FDB_STATUS)
+        names = {index[0]: str(name) for index, name in columns[IF_NAME].items()}
+        base_ports = {index[0]: int(if_index) for index, if_index in columns[DOT1D_BASE_PORT_IF_INDEX].items()}
+        statuses = columns[DOT1Q_TP_FDB_STATUS]
+
+        # индекс строки: fdb id (vlan) и шесть октетов MAC
+        for index, port in columns[DOT1Q_TP_FDB_PORT].items():
+            if len(index) != 7:
+                continue
+            port = int(port)
+            if_index = base_ports.get(port, port)
+            yield {
+                "active": True,
+                "interface": names.get(if_index, ''),
+                "last_move": -1.0,
+                "mac": ':'.join('{0:02x}'.format(octet) for octet in index[1:]),
+                "moves": -1,
+                "static": int(statuses.get(index, FDB_STATUS_LEARNED)) != FDB_STATUS_LEARNED,
+                "vlan": str(index[0])
+            }
+
+    def get_mac_address_table(self):
+        """Return the MAC address table in the CEDriver.get_mac_address_table format."""
+        return list(self.iter_mac_address_table())
@@ -0,0 +1,178 @@
+"""
+Per-command and per-getter timing of CEDriver.
+
+Every command sent to the device is recorded with its wall time, output size and
+line count; every getter with its wall time split into transport time (commands
+run while it was active) and parse time (the rest).
+"""
+import functools
+import time
+
+
+class CommandStats(object):
+    """
+    Aggregated command and getter timings of one device.
+
+    callbacks are called with every record as a dict:
+    {'device': '10.0.0.1', 'kind': 'command', 'name': 'show arp', 'seconds': 0.31,
+    'bytes': 20480, 'lines': 260, 'cached': False} or
+    {'device': '10.0.0.1', 'kind': 'getter', 'name': 'get_arp_table', 'seconds': 0.35,
+    'transport': 0.31, 'parse': 0.04, 'error': None}.
+    """
+
+    def __init__(self, device=None, callbacks=None):
+        self.device = device
+        self.callbacks = list(callbacks or [])
+        self.commands = {}
+        self.getters = {}
+        # активные геттеры (вложенные тоже), время команд добавляется каждому
+        self._active = []
+
+    def reset(self):
+        """Drop all recorded timings."""
+        self.commands = {}
+        self.getters = {}
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def _notify(self, record):
+        for callback in self.callbacks:
+            callback(record)
+
+    def record_command(self, command, seconds, output='', cached=False, size=None, lines=None):
+        """
+        Record one command, outputs served from the cache are only counted as cache hits.
+
+        size and lines are taken from output unless given (for streamed output).
+        """
+        if size is None:
+            size = len(output) if output else 0
+        if lines is None:
+            lines = output.count('\n') + 1 if output else 0
+        stats = self.commands.get(command)
+        if stats is None:
+            stats = self.commands[command] = {
+                'calls': 0, 'cache_hits': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'bytes': 0, 'lines': 0
+            }
+        if cached:
+            stats['cache_hits'] += 1
+        else:
+            stats['calls'] += 1
+            stats['seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+            stats['bytes'] += size
+            stats['lines'] += lines
+            for frame in self._active:
+                frame[1] += seconds
+        if self.callbacks:
+            self._notify({
+                'device': self.device, 'kind': 'command', 'name': command, 'seconds': seconds,
+                'bytes': size, 'lines': lines, 'cached': cached
+            })
+
+    def record_batch(self, commands, seconds, outputs):
+        """Record commands sent in one batch (pipelined), the batch time is split between them equally."""
+        for command, output in zip(commands, outputs):
+            self.record_command(command, seconds / len(commands), output)
+
+    def timed_getter(self, name, method, *args, **kwargs):
+        """Call a getter, recording its wall, transport and parse time."""
+        frame = [name, 0.0]
+        self._active.append(frame)
+        started = time.monotonic()
+        error = None
+        try:
+            return method(*args, **kwargs)
+        except Exception as err:
+            error = str(err)
+            raise
+        finally:
+            seconds = time.monotonic() - started
+            self._active.remove(frame)
+            self._record_getter(name, seconds, frame[1], error)
+
+    def _record_getter(self, name, seconds, transport, error):
+        transport = min(transport, seconds)
+        stats = self.getters.get(name)
+        if stats is None:
+            stats = self.getters[name] = {
+                'calls': 0, 'errors': 0, 'seconds': 0.0, 'transport_seconds': 0.0, 'parse_seconds': 0.0
+            }
+        stats['calls'] += 1
+        stats['errors'] += error is not None
+        stats['seconds'] += seconds
+        stats['transport_seconds'] += transport
+        stats['parse_seconds'] += seconds - transport
+        if self.callbacks:
+            self._notify({
+                'device': self.device, 'kind': 'getter', 'name': name, 'seconds': seconds,
+                'transport': transport, 'parse': seconds - transport, 'error': error
+            })
+
+    def snapshot(self):
+        """Return a copy of the aggregates: {'device': ..., 'commands': {...}, 'getters': {...}}."""
+        return {
+            'device': self.device,
+            'commands': {command: dict(stats) for command, stats in self.commands.items()},
+            'getters': {name: dict(stats) for name, stats in self.getters.items()}
+        }
+
+    def to_prometheus(self):
+        """Return the aggregates in the Prometheus text exposition format."""
+        return prometheus_text([self])
+
+
+def instrumented(method):
+    """Decorate a CEDriver getter to be timed when the driver has stats enabled."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.stats is None:
+            return method(self, *args, **kwargs)
+        return self.stats.timed_getter(method.__name__, method, self, *args, **kwargs)
+    return wrapper
+
+
+# имя метрики, тип, описание, раздел, ключ агрегата, дополнительные метки
+PROMETHEUS_METRICS = (
+    ('napalm_eltex_command_calls_total', 'counter', 'Commands sent to the device.',
+     'commands', 'calls', ()),
+    ('napalm_eltex_command_cache_hits_total', 'counter', 'Command outputs served from the session cache.',
+     'commands', 'cache_hits', ()),
+    ('napalm_eltex_command_seconds_total', 'counter', 'Wall time of commands.',
+     'commands', 'seconds', ()),
+    ('napalm_eltex_command_output_bytes_total', 'counter', 'Output size of commands read from the device.',
+     'commands', 'bytes', ()),
+    ('napalm_eltex_command_output_lines_total', 'counter', 'Output lines of commands read from the device.',
+     'commands', 'lines', ()),
+    ('napalm_eltex_getter_calls_total', 'counter', 'Getter calls.',
+     'getters', 'calls', ()),
+    ('napalm_eltex_getter_errors_total', 'counter', 'Getter calls that raised.',
+     'getters', 'errors', ()),
+    ('napalm_eltex_getter_seconds_total', 'counter', 'Wall time of getters by phase.',
+     'getters', 'transport_seconds', (('phase', 'transport'),)),
+    ('napalm_eltex_getter_seconds_total', 'counter', None,
+     'getters', 'parse_seconds', (('phase', 'parse'),)),
+)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text(stats_list):
+    """Return the aggregates of several CommandStats (e.g. of a whole fleet) as one Prometheus text page."""
+    stats_list = list(stats_list)
+    lines = []
+    for metric, metric_type, description, section, key, extra_labels in PROMETHEUS_METRICS:
+        if description is not None:
+            lines.append('# HELP {0} {1}'.format(metric, description))
+            lines.append('# TYPE {0} {1}'.format(metric, metric_type))
+        name_label = 'command' if section == 'commands' else 'getter'
+        for stats in stats_list:
+            for name, values in sorted(getattr(stats, section).items()):
+                labels = [('device', stats.device), (name_label, name)] + list(extra_labels)
+                lines.append('{0}{{{1}}} {2}'.format(
+                    metric, ','.join('{0}="{1}"'.format(label, _label(value)) for label, value in labels),
+                    values[key]))
+    return '\n'.join(lines) + '\n'
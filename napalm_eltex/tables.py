@@ -0,0 +1,91 @@
+"""
+Table parsers for Eltex CLI output.
+
+Replacement for the pandas read_fwf/read_csv calls the driver used to make:
+cells are returned as stripped strings, empty cells as None.
+"""
+import re
+
+_RE_COLUMN = re.compile(b'\x01+')
+# byte -> 0 for whitespace, 1 for text; lines are encoded one byte per character
+_SHAPE_TABLE = bytes(0 if chr(i).isspace() else 1 for i in range(256))
+
+
+def infer_colspecs(lines):
+    """
+    Return column boundaries of a fixed-width table as a list of (start, end) pairs.
+
+    A column is a run of positions which hold text in at least one line,
+    columns are separated by positions which are blank in every line.
+    """
+    # rows of one table mostly share a handful of shapes, so each shape is merged once
+    shapes = {line.encode('latin-1', 'replace').translate(_SHAPE_TABLE) for line in lines}
+    width = max([len(shape) for shape in shapes] + [0])
+    mask = 0
+    for shape in shapes:
+        mask |= int.from_bytes(shape.ljust(width, b'\x00'), 'big')
+    mask = mask.to_bytes(width, 'big')
+    return [match.span() for match in _RE_COLUMN.finditer(mask)]
+
+
+def read_fixed_width(lines, colspecs=None):
+    """
+    Split lines of a fixed-width table into rows of cells.
+
+    Blank lines are skipped, column boundaries are inferred from the lines
+    themselves unless colspecs are given.
+    """
+    lines = [line for line in lines if line.strip()]
+    if colspecs is None:
+        colspecs = infer_colspecs(lines)
+    return [[line[start:end].strip() or None for start, end in colspecs] for line in lines]
+
+
+def read_delimited(lines, delimiter=';', ncols=0):
+    """
+    Split delimited lines into rows of cells.
+
+    Blank lines are skipped, short rows are padded with None up to the widest
+    row (or ncols, if it is wider).
+    """
+    rows = []
+    for line in lines:
+        if not line.strip():
+            continue
+        rows.append([cell.strip() or None for cell in line.split(delimiter)])
+    width = max([ncols] + [len(row) for row in rows])
+    for row in rows:
+        row.extend([None] * (width - len(row)))
+    return rows
+
+
+def merge_wrapped_rows(rows, key=0):
+    """
+    Glue wrapped rows back onto the row they continue.
+
+    Eltex wraps values which do not fit into their column onto the next line,
+    leaving the key column of that line empty. Every non-empty cell of such a
+    line is appended to the same cell of the previous row.
+    """
+    merged = []
+    for row in rows:
+        if row[key] is None:
+            if merged:
+                prev = merged[-1]
+                for i, cell in enumerate(row):
+                    if cell is not None:
+                        prev[i] = cell if prev[i] is None else prev[i] + cell
+            continue
+        merged.append(list(row))
+    return merged
+
+
+def table_body(lines, separator='-----'):
+    """Return the lines following the last header separator line."""
+    body = None
+    for line in lines:
+        if separator in line:
+            body = []
+        elif body is not None:
+            body.append(line)
+    return body or []
@@ -0,0 +1,79 @@
+"""
+Per-command read timeouts learned from observed latency.
+"""
+import json
+import os
+import re
+
+
+class TimeoutHistory(object):
+    """
+    Latency history of the commands of one device.
+
+    The timeout of a command is computed like the TCP retransmission timeout:
+    smoothed latency plus ``factor`` smoothed deviations, clamped to
+    [minimum, maximum]. A command that timed out doubles its smoothed latency.
+    With ``directory`` the history is stored in a JSON file per device.
+    """
+
+    # вес нового замера в сглаженных значениях (как в RFC 6298)
+    alpha = 0.125
+    beta = 0.25
+
+    def __init__(self, device, directory=None, factor=4.0, minimum=5.0, maximum=300.0):
+        self.device = device
+        self.directory = directory
+        self.factor = factor
+        self.minimum = minimum
+        self.maximum = maximum
+        self.commands = {}
+        if directory:
+            self.load()
+
+    def path(self):
+        """Return the file the history of the device is stored in."""
+        name = re.sub(r'[^\w.-]', '_', self.device)
+        return os.path.join(self.directory, name + '.timeouts.json')
+
+    def load(self):
+        """Read the stored history, a missing or broken file gives an empty one."""
+        try:
+            with open(self.path(), 'r', encoding='utf-8') as fs:
+                self.commands = json.load(fs).get('commands', {})
+        except (OSError, ValueError):
+            self.commands = {}
+
+    def save(self):
+        """Store the history, written to a temporary file and renamed over the old one."""
+        if not self.directory:
+            return
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        path = self.path()
+        tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+        with open(tmp_path, 'w', encoding='utf-8') as fs:
+            json.dump({'device': self.device, 'commands': self.commands}, fs)
+        os.replace(tmp_path, path)
+
+    def timeout(self, command, default=None):
+        """Return the read timeout for a command, default if it has no history yet."""
+        entry = self.commands.get(command)
+        if entry is None:
+            return default
+        value = entry['latency'] + self.factor * entry['deviation']
+        return min(max(value, self.minimum), self.maximum)
+
+    def observe(self, command, seconds):
+        """Add a latency sample of a command."""
+        entry = self.commands.get(command)
+        if entry is None:
+            self.commands[command] = {'latency': seconds, 'deviation': seconds / 2, 'samples': 1}
+            return
+        entry['deviation'] += self.beta * (abs(seconds - entry['latency']) - entry['deviation'])
+        entry['latency'] += self.alpha * (seconds - entry['latency'])
+        entry['samples'] += 1
+
+    def backoff(self, command, timeout):
+        """Take into account that a command did not finish in timeout seconds."""
+        entry = self.commands.setdefault(command, {'latency': 0.0, 'deviation': 0.0, 'samples': 0})
+        entry['latency'] = min(max(entry['latency'], timeout) * 2, self.maximum)
@@ -49,8 +49,6 @@ setup(
 
         "Programming Language :: Python :: 3",
 
-        "Programming Language :: Python :: 3.6",
-
         "Programming Language :: Python :: 3.7",
 
         "Programming Language :: Python :: 3.8",
@@ -70,9 +68,16 @@ setup(
     },
     include_package_data=True,
 
+    python_requires='>=3.7',
+
     install_requires=[
-        'napalm>=3.3',
-        'pandas>=1.3'
-    ]
+        'napalm>=3.3'
+    ],
+
+    extras_require={
+        'async': ['asyncssh>=2.5'],
+        'snmp': ['pysnmp>=7.0'],
+        'arrow': ['pyarrow>=10.0'],
+    }
 )
 
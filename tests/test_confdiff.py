@@ -0,0 +1,158 @@
+"""Tests of napalm_eltex.confdiff."""
+from napalm_eltex.confdiff import (
+    compress_vlans,
+    diff_configs,
+    expand_vlans,
+    merge_diff,
+    negate,
+    push_commands,
+    split_sections,
+    vlan_ranges,
+)
+
+RUNNING = """config-file-header
+sw-1
+v1.0.0 / R1
+CLI v1.0
+file SSD indicator encrypted
+@
+!
+hostname sw-1
+vlan database
+ vlan 2-10,3000
+exit
+!
+ip igmp snooping vlan 2-4
+interface gi1/0/1
+ description user
+ switchport mode trunk
+ switchport trunk allowed vlan add 2-10
+exit
+interface gi1/0/2
+ switchport access vlan 5
+exit
+"""
+
+
+def test_split_sections():
+    sections = split_sections(RUNNING)
+    assert list(sections) == [
+        ('hostname sw-1', 1),
+        ('vlan database', 1),
+        ('ip igmp snooping vlan 2-4', 1),
+        ('interface gi1/0/1', 1),
+        ('interface gi1/0/2', 1),
+    ]
+    assert sections['vlan database', 1] == ['vlan 2-10,3000']
+    assert sections['interface gi1/0/1', 1] == [
+        'description user', 'switchport mode trunk', 'switchport trunk allowed vlan add 2-10'
+    ]
+
+
+def test_split_sections_repeated_header():
+    sections = split_sections('line ssh\n exec-timeout 10\nexit\nline ssh\n exec-timeout 20\nexit\n')
+    assert sections['line ssh', 1] == ['exec-timeout 10']
+    assert sections['line ssh', 2] == ['exec-timeout 20']
+
+
+def test_diff_configs():
+    assert diff_configs(RUNNING, RUNNING) == ''
+    candidate = RUNNING.replace(' description user\n', ' description printer\n').replace(
+        'interface gi1/0/2\n switchport access vlan 5\nexit\n', 'interface gi1/0/3\n shutdown\nexit\n')
+    assert diff_configs(RUNNING, candidate).splitlines() == [
+        ' interface gi1/0/1',
+        '- description user',
+        '+ description printer',
+        '+interface gi1/0/3',
+        '+ shutdown',
+        '-interface gi1/0/2',
+        '- switchport access vlan 5',
+    ]
+
+
+def test_merge_diff():
+    candidate = 'interface gi1/0/1\n description user\n spanning-tree portfast\nexit\n'
+    assert merge_diff(RUNNING, candidate).splitlines() == [' interface gi1/0/1', '+ spanning-tree portfast']
+
+
+def test_diff_configs_vlan_lists():
+    candidate = RUNNING.replace('vlan 2-10,3000', 'vlan 2-6,7,8-10,3000').replace(
+        'allowed vlan add 2-10', 'allowed vlan add 2-5,6-10')
+    assert diff_configs(RUNNING, candidate) == ''
+    candidate = RUNNING.replace('vlan 2-10,3000', 'vlan 2-8,3000,3001').replace(
+        'ip igmp snooping vlan 2-4\n', 'ip igmp snooping vlan 2-6\n')
+    assert diff_configs(RUNNING, candidate).splitlines() == [
+        ' vlan database',
+        '- vlan 9-10',
+        '+ vlan 3001',
+        '+ip igmp snooping vlan 5-6',
+    ]
+
+
+def test_merge_diff_vlan_lists():
+    candidate = 'vlan database\n vlan 5\nexit\nip igmp snooping vlan 3\n' \
+                'interface gi1/0/1\n switchport trunk allowed vlan add 4,7\nexit\n'
+    assert merge_diff(RUNNING, candidate) == ''
+    candidate = 'vlan database\n vlan 5,11,12\nexit\nip igmp snooping vlan 4-6\n'
+    assert merge_diff(RUNNING, candidate).splitlines() == [
+        ' vlan database',
+        '+ vlan 11-12',
+        '+ip igmp snooping vlan 5-6',
+    ]
+
+
+def test_negate():
+    assert negate('shutdown') == 'no shutdown'
+    assert negate('no shutdown') == 'shutdown'
+    assert negate('switchport trunk allowed vlan add 6-10') == 'switchport trunk allowed vlan remove 6-10'
+    assert negate('switchport general allowed vlan add 20 tagged') == 'switchport general allowed vlan remove 20'
+
+
+def test_vlan_lists():
+    assert expand_vlans(['vlan 2-4,10', 'description 2-4']) == ['vlan 2', 'vlan 3', 'vlan 4', 'vlan 10', 'description 2-4']
+    assert expand_vlans(['switchport general allowed vlan add 10,11 tagged']) == [
+        'switchport general allowed vlan add 10 tagged', 'switchport general allowed vlan add 11 tagged'
+    ]
+    assert vlan_ranges([10, 4, 2, 3, 3]) == '2-4,10'
+    assert compress_vlans(['vlan 3', 'name x', 'vlan 2', 'vlan 10']) == ['vlan 2-3,10', 'name x']
+
+
+def test_push_merge():
+    candidate = 'interface gi1/0/1\n description printer\nexit\ninterface gi1/0/4\n shutdown\nexit\n'
+    assert push_commands(RUNNING, candidate) == [
+        'interface gi1/0/1', 'description printer', 'exit',
+        'interface gi1/0/4', 'shutdown', 'exit',
+    ]
+    assert push_commands(RUNNING, RUNNING) == []
+
+
+def test_push_merge_vlan_in_range():
+    # VLAN, уже входящий в диапазон running-config, команд не порождает
+    candidate = 'vlan database\n vlan 5,3000\nexit\nip igmp snooping vlan 3\n' \
+                'interface gi1/0/1\n switchport trunk allowed vlan add 4\nexit\n'
+    assert push_commands(RUNNING, candidate) == []
+
+
+def test_push_merge_vlan_list():
+    candidate = 'vlan database\n vlan 11\n vlan 12\n vlan 9-13\nexit\nip igmp snooping vlan 5\nip igmp snooping vlan 6\n'
+    assert push_commands(RUNNING, candidate) == [
+        'vlan database', 'vlan 11-13', 'exit',
+        'ip igmp snooping vlan 5-6',
+    ]
+
+
+def test_push_replace():
+    candidate = RUNNING.replace('vlan 2-10,3000', 'vlan 2-5,3000').replace(
+        'allowed vlan add 2-10', 'allowed vlan add 2-5').replace(' description user\n', '').replace(
+        'interface gi1/0/2\n switchport access vlan 5\nexit\n', '').replace('ip igmp snooping vlan 2-4\n', '')
+    assert push_commands(RUNNING, candidate, replace=True) == [
+        'vlan database', 'no vlan 6-10', 'exit',
+        'interface gi1/0/1', 'no description user', 'switchport trunk allowed vlan remove 6-10', 'exit',
+        'no ip igmp snooping vlan 2-4',
+        'interface gi1/0/2', 'no switchport access vlan 5', 'exit',
+    ]
+
+
+def test_push_replace_same_vlans_other_format():
+    candidate = RUNNING.replace('vlan 2-10,3000', 'vlan 2-6,7,8-10,3000')
+    assert push_commands(RUNNING, candidate, replace=True) == []
@@ -0,0 +1,102 @@
+"""Tests of napalm_eltex.counters."""
+import time
+
+from napalm_eltex.counters import COUNTER32, COUNTER64, COUNTER_FIELDS, CounterTracker
+from napalm_eltex.eltex import CEDriver
+
+SHOW_SYSTEM = """System Description:                       MES2348B 48-port 1G
+System Up Time (days,hour:min:sec):        00,{0:02d}:{1:02d}:{2:02d}
+System Name:                              sw-1
+"""
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeDevice(object):
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.commands = []
+
+    def send_command(self, command, **kwargs):
+        self.commands.append(command)
+        # аптайм идёт вместе с часами теста
+        uptime = int(self.clock.now)
+        return SHOW_SYSTEM.format(uptime // 3600, uptime // 60 % 60, uptime % 60)
+
+    def disconnect(self):
+        pass
+
+
+def counters(octets):
+    return {'gi1/0/1': dict({field: 0 for field in COUNTER_FIELDS}, rx_octets=str(octets))}
+
+
+def test_first_sample():
+    tracker = CounterTracker()
+    result = tracker.update(counters(1000), uptime=100, timestamp=10.0)
+    assert result == {'interval': 0.0, 'reset': False, 'deltas': {}, 'rates': {}}
+    assert len(tracker) == 1
+    # новый интерфейс во втором опросе получает только базу
+    second = dict(counters(1500), **{'gi1/0/2': counters(7)['gi1/0/1']})
+    result = tracker.update(second, uptime=110, timestamp=20.0)
+    assert list(result['deltas']) == ['gi1/0/1']
+    assert result['rates']['gi1/0/1']['rx_octets'] == 50.0
+
+
+def test_wrap_32():
+    tracker = CounterTracker()
+    tracker.update(counters(COUNTER32 - 100), timestamp=0.0)
+    result = tracker.update(counters(50), timestamp=10.0)
+    assert result['deltas']['gi1/0/1']['rx_octets'] == 150
+    assert result['rates']['gi1/0/1']['rx_octets'] == 15.0
+
+
+def test_wrap_64():
+    tracker = CounterTracker()
+    tracker.update(counters(COUNTER64 - 100), timestamp=0.0)
+    result = tracker.update(counters(50), timestamp=10.0)
+    assert result['deltas']['gi1/0/1']['rx_octets'] == 150
+    # 64-битные счётчики по counter_bits, даже если прошлое значение влезает в 32 бита
+    tracker = CounterTracker(counter_bits=64)
+    tracker.update(counters(COUNTER32 - 100), timestamp=0.0)
+    result = tracker.update(counters(50), timestamp=10.0)
+    assert result['deltas']['gi1/0/1']['rx_octets'] == COUNTER64 - COUNTER32 + 150
+
+
+def test_reset_from_uptime():
+    tracker = CounterTracker()
+    tracker.update(counters(5000), uptime=3600, timestamp=0.0)
+    result = tracker.update(counters(200), uptime=30, timestamp=300.0)
+    assert result['reset'] is True
+    assert result['deltas'] == {}
+    # после перезагрузки отсчёт идёт от новой базы
+    result = tracker.update(counters(500), uptime=330, timestamp=600.0)
+    assert result['reset'] is False
+    assert result['deltas']['gi1/0/1']['rx_octets'] == 300
+
+
+def test_rates_with_command_cache(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, 'monotonic', clock)
+    driver = CEDriver('sw-1', 'admin', 'admin', optional_args={'command_cache': True, 'command_cache_ttl': 60})
+    driver.device = FakeDevice(clock)
+    polls = iter([counters(1000), counters(3000)])
+    monkeypatch.setattr(driver, 'get_interfaces_counters', lambda interfaces=None: next(polls))
+
+    assert driver.get_interfaces_counters_rates()['deltas'] == {}
+    # второй опрос раньше истечения TTL кэша
+    clock.now += 20
+    result = driver.get_interfaces_counters_rates()
+    assert result['reset'] is False
+    assert result['interval'] == 20
+    assert result['deltas']['gi1/0/1']['rx_octets'] == 2000
+    assert result['rates']['gi1/0/1']['rx_octets'] == 100.0
+    assert driver.device.commands == ['show system', 'show system']
@@ -0,0 +1,68 @@
+"""Tests of napalm_eltex.fleet.MacLocator."""
+from napalm_eltex.fleet import MacLocator
+
+NEIGHBOR = {'hostname': 'core-1', 'port': 'te1/0/1'}
+PHONE = {'hostname': 'SIP-T46', 'port': 'WAN'}
+
+
+def entry(mac, interface, vlan='10'):
+    return {'mac': mac, 'interface': interface, 'vlan': vlan, 'static': False, 'active': True,
+            'moves': -1, 'last_move': -1.0}
+
+
+def test_ingest_find():
+    locator = MacLocator()
+    locator.ingest('access-1', [entry('a8:f9:4b:8b:9c:01', 'gi1/0/7')], {'te1/0/1': [NEIGHBOR]})
+    locator.ingest('core-1', [entry('a8:f9:4b:8b:9c:01', 'te1/0/1')], {'te1/0/1': [NEIGHBOR]})
+    assert len(locator) == 1
+    assert 'a8f9.4b8b.9c01' in locator
+    assert locator.find('A8-F9-4B-8B-9C-01') == {'hostname': 'access-1', 'vlan': '10', 'interface': 'gi1/0/7', 'edge': True}
+    assert [location['hostname'] for location in locator.locate('a8:f9:4b:8b:9c:01')] == ['access-1', 'core-1']
+    assert locator.find('00:00:00:00:00:01') is None
+
+
+def test_ingest_replaces_device():
+    locator = MacLocator()
+    locator.ingest('access-1', [entry('00:00:00:00:00:01', 'gi1/0/1'), entry('00:00:00:00:00:02', 'gi1/0/2')])
+    locator.ingest('access-1', [entry('00:00:00:00:00:02', 'gi1/0/3')])
+    assert '00:00:00:00:00:01' not in locator
+    assert locator.find('00:00:00:00:00:02')['interface'] == 'gi1/0/3'
+
+
+def test_edge_neighbor():
+    locator = MacLocator(edge_neighbor=lambda neighbor: neighbor['hostname'].startswith('SIP-'))
+    locator.ingest('access-1', [entry('00:00:00:00:00:01', 'gi1/0/5')], {'gi1/0/5': [PHONE]})
+    assert locator.find('00:00:00:00:00:01')['edge'] is True
+
+
+def test_port_channel_uplink():
+    locator = MacLocator()
+    # LLDP видит соседа на портах-членах, MAC изучен на po1
+    locator.ingest('access-1', [entry('00:00:00:00:00:01', 'po1')], {'te1/0/1': [NEIGHBOR], 'te1/0/2': [NEIGHBOR]})
+    locator.ingest('access-2', [entry('00:00:00:00:00:01', 'gi1/0/9')])
+    assert locator.find('00:00:00:00:00:01')['hostname'] == 'access-2'
+    assert locator.locate('00:00:00:00:00:01')[1]['edge'] is False
+
+
+def test_port_channel_members():
+    locator = MacLocator()
+    neighbors = {'te1/0/1': [NEIGHBOR]}
+    lags = {'po1': ['te1/0/1', 'te1/0/2'], 'po2': ['gi1/0/1', 'gi1/0/2']}
+    locator.ingest('access-1', [entry('00:00:00:00:00:01', 'po1'), entry('00:00:00:00:00:02', 'po2')],
+                   neighbors, lag_members=lags)
+    assert locator.find('00:00:00:00:00:01')['edge'] is False
+    # LAG к серверу без LLDP остаётся портом доступа
+    assert locator.find('00:00:00:00:00:02')['edge'] is True
+
+
+def test_forget():
+    locator = MacLocator()
+    locator.ingest('access-1', [entry('00:00:00:00:00:01', 'gi1/0/1')])
+    locator.ingest('access-2', [entry('00:00:00:00:00:01', 'te1/0/1'), entry('00:00:00:00:00:02', 'gi1/0/2')])
+    locator.forget('access-2')
+    assert len(locator) == 1
+    assert locator.locate('00:00:00:00:00:01') == [
+        {'hostname': 'access-1', 'vlan': '10', 'interface': 'gi1/0/1', 'edge': True}
+    ]
+    assert 'access-2' not in locator.updated
+    locator.forget('access-3')
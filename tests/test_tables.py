@@ -0,0 +1,114 @@
+"""Tests of napalm_eltex.tables on Eltex CLI output."""
+from napalm_eltex.tables import infer_colspecs, merge_wrapped_rows, read_delimited, read_fixed_width, table_body
+
+# октеты аплинка не помещаются в колонку и переносятся на следующую строку
+SHOW_COUNTERS = """
+    Port      InUcastPkts  InMcastPkts  InBcastPkts     InOctets
+---------- ------------ ------------ ------------ ------------
+gi1/0/1      1396550631       314766        59701  10614485844
+te1/0/1      1396550632       314767        59702 106144858448
+                                                  1
+te1/0/2               0            0            0            0
+"""
+
+# "vlan" и номер VLAN в разных колонках
+SHOW_ARP_SPLIT = """
+Total number of entries: 2
+
+  VLAN    Interface     IP address        HW address          status
+--------- --------- --------------- ------------------- ---------------
+vlan 1    gi1/0/1   192.168.1.10    a8:f9:4b:8b:9c:01   dynamic
+vlan 100  gi1/0/24  10.10.0.5       00:11:22:33:44:55   static
+"""
+
+# номер VLAN выровнен вправо, "vlan N" попадает в одну колонку
+SHOW_ARP_JOINED = """
+Total number of entries: 3
+
+  VLAN    Interface     IP address        HW address          status
+--------- --------- --------------- ------------------- ---------------
+   vlan 1 gi1/0/1   192.168.1.10    a8:f9:4b:8b:9c:01   dynamic
+  vlan 10 gi1/0/2   10.10.0.5       00:11:22:33:44:55   dynamic
+ vlan 100 te1/0/1   10.100.0.1      e0:d9:e3:1a:2b:3c   dynamic
+"""
+
+# длинное имя системы продолжается на следующей строке с пустой колонкой порта
+SHOW_LLDP_NEIGHBORS = """
+System capability supported: Bridge, Router
+
+  Port        Device ID          Port ID          System Name    Capabilities
+--------- ----------------- ----------------- ----------------- ------------
+gi1/0/1   a8:f9:4b:8b:9c:01 gi1/0/48          core-switch-bui   B, R
+                                              lding-1
+te1/0/1   e0:d9:e3:1a:2b:3c te1/0/4           agg-2             B, R
+"""
+
+
+def test_table_body():
+    assert table_body(SHOW_ARP_SPLIT.splitlines())[0].startswith('vlan 1 ')
+    assert len(table_body(SHOW_COUNTERS.splitlines())) == 4
+    assert table_body(['no table here']) == []
+    # разделитель LLDP длиннее, чем у других таблиц
+    assert table_body(['-----', 'a', '------', 'b'], '------') == ['b']
+
+
+def test_infer_colspecs():
+    lines = table_body(SHOW_COUNTERS.splitlines())
+    assert infer_colspecs(lines) == [(0, 7), (13, 23), (30, 36), (44, 49), (50, 62)]
+    assert infer_colspecs(['ab  cd', 'a    d ', '']) == [(0, 2), (4, 6)]
+    assert infer_colspecs([]) == []
+
+
+def test_wrapped_counters():
+    rows = merge_wrapped_rows(read_fixed_width(table_body(SHOW_COUNTERS.splitlines())))
+    assert rows == [
+        ['gi1/0/1', '1396550631', '314766', '59701', '10614485844'],
+        ['te1/0/1', '1396550632', '314767', '59702', '1061448584481'],
+        ['te1/0/2', '0', '0', '0', '0'],
+    ]
+
+
+def test_arp_split_vlan():
+    rows = read_fixed_width(table_body(SHOW_ARP_SPLIT.splitlines()))
+    assert rows == [
+        ['vlan', '1', 'gi1/0/1', '192.168.1.10', 'a8:f9:4b:8b:9c:01', 'dynamic'],
+        ['vlan', '100', 'gi1/0/24', '10.10.0.5', '00:11:22:33:44:55', 'static'],
+    ]
+
+
+def test_arp_joined_vlan():
+    rows = read_fixed_width(table_body(SHOW_ARP_JOINED.splitlines()))
+    assert rows == [
+        ['vlan 1', 'gi1/0/1', '192.168.1.10', 'a8:f9:4b:8b:9c:01', 'dynamic'],
+        ['vlan 10', 'gi1/0/2', '10.10.0.5', '00:11:22:33:44:55', 'dynamic'],
+        ['vlan 100', 'te1/0/1', '10.100.0.1', 'e0:d9:e3:1a:2b:3c', 'dynamic'],
+    ]
+
+
+def test_read_fixed_width_colspecs():
+    lines = ['gi1/0/1   up', '', 'te1/0/1']
+    assert read_fixed_width(lines, colspecs=[(0, 7), (10, 12)]) == [['gi1/0/1', 'up'], ['te1/0/1', None]]
+
+
+def test_lldp_continuation():
+    rows = merge_wrapped_rows(read_fixed_width(table_body(SHOW_LLDP_NEIGHBORS.splitlines(), '------')))
+    assert [row[:4] for row in rows] == [
+        ['gi1/0/1', 'a8:f9:4b:8b:9c:01', 'gi1/0/48', 'core-switch-building-1'],
+        ['te1/0/1', 'e0:d9:e3:1a:2b:3c', 'te1/0/4', 'agg-2'],
+    ]
+
+
+def test_read_delimited():
+    # строки LLDP после замены пробелов на ';' в драйвере
+    lines = [
+        'gi1/0/1;a8:f9:4b:8b:9c:01;gi1/0/48;core-switch-bui;B-R', ';;;lding-1', '',
+        'te1/0/1;e0:d9:e3:1a:2b:3c;te1/0/4'
+    ]
+    rows = read_delimited(lines, delimiter=';', ncols=4)
+    assert rows == [
+        ['gi1/0/1', 'a8:f9:4b:8b:9c:01', 'gi1/0/48', 'core-switch-bui', 'B-R'],
+        [None, None, None, 'lding-1', None],
+        ['te1/0/1', 'e0:d9:e3:1a:2b:3c', 'te1/0/4', None, None],
+    ]
+    assert merge_wrapped_rows(rows)[0][3] == 'core-switch-building-1'
+    assert read_delimited(['a,b,c', 'd'], delimiter=',', ncols=4) == [['a', 'b', 'c', None], ['d', None, None, None]]
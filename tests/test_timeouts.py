@@ -0,0 +1,60 @@
+"""Tests of napalm_eltex.timeouts and the retry of timed out commands."""
+import pytest
+from netmiko.exceptions import ReadTimeout
+
+from napalm_eltex.eltex import CEDriver
+from napalm_eltex.timeouts import TimeoutHistory
+
+
+class SlowDevice(object):
+    """Times out the first timeouts sends of a command."""
+
+    def __init__(self, timeouts=1):
+        self.timeouts = timeouts
+        self.calls = []
+
+    def send_command(self, command, **kwargs):
+        self.calls.append(('send_command', kwargs.get('read_timeout')))
+        if self.timeouts:
+            self.timeouts -= 1
+            raise ReadTimeout('Pattern not detected')
+        return 'System Name: sw-1'
+
+    def read_until_prompt(self, read_timeout=10.0):
+        self.calls.append(('read_until_prompt', read_timeout))
+        return 'sw-1#'
+
+    def disconnect(self):
+        pass
+
+
+def test_timeout():
+    history = TimeoutHistory('sw-1', minimum=1.0, maximum=60.0)
+    assert history.timeout('show system', default=10.0) == 10.0
+    history.observe('show system', 2.0)
+    assert history.timeout('show system') == 6.0
+    history.observe('show system', 2.0)
+    assert history.timeout('show system') == 5.0
+    history.backoff('show system', 5.0)
+    assert history.timeout('show system') == 13.0
+    history.backoff('show system', 40.0)
+    assert history.timeout('show system') == 60.0
+
+
+def test_retry_with_backed_off_timeout():
+    driver = CEDriver('sw-1', 'admin', 'admin', optional_args={'adaptive_timeouts': True})
+    driver.device = SlowDevice()
+    assert driver._device_send_command('show system', read_timeout=10.0) == 'System Name: sw-1'
+    assert driver.device.calls == [
+        ('send_command', 10.0), ('read_until_prompt', 20.0), ('send_command', 20.0)
+    ]
+    assert driver.timeouts.commands['show system']['samples'] == 1
+
+
+def test_retry_once():
+    driver = CEDriver('sw-1', 'admin', 'admin', optional_args={'adaptive_timeouts': True})
+    driver.device = SlowDevice(timeouts=2)
+    with pytest.raises(ReadTimeout):
+        driver._device_send_command('show system', read_timeout=10.0)
+    assert [call[0] for call in driver.device.calls] == ['send_command', 'read_until_prompt', 'send_command']
+    assert driver.timeouts.timeout('show system') == 40.0